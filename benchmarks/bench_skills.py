@@ -0,0 +1,249 @@
+"""
+Skill Benchmarks
+以 benchmarks/fake_github.py (本地的 GitHub API 替身) 量測 skill client 的效能，不需要網路與 token：
+- register:        註冊新專案
+- log:             STATUS.md 已有 10 / 100 / 1000 筆日誌時寫入一筆
+- update_status:   DASHBOARD 有 10 / 100 / 1000 列時更新狀態
+- memory_pull:     第一次 pull (冷) / 沒有變動時 pull (熱)
+- memory_push:     修改一個檔案後 push
+每個項目回報耗時 (median / p95 / max)、每次操作的 API 請求數與 commit 數。
+
+用法:
+    python benchmarks/bench_skills.py
+    python benchmarks/bench_skills.py log update_status --latency 50 --iterations 20
+    python benchmarks/bench_skills.py --rate-limit 300 --throttle-every 25 --json bench.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+from contextlib import redirect_stdout
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _dir in ("common", "command_center_reporter", "dual_layer_memory", "benchmarks"):
+    if os.path.join(_ROOT, _dir) not in sys.path:
+        sys.path.insert(0, os.path.join(_ROOT, _dir))
+
+import github_pool
+import reporter_client
+import memory_client
+from fake_github import FakeGitHub
+
+TOKEN = "bench-token"
+OWNER = "tester"
+HISTORY_SIZES = (10, 100, 1000)
+DASHBOARD_ROWS = (10, 100, 1000)
+MEMORY_FILES = 20
+MEMORY_FILE_SIZE = 4096
+
+DASHBOARD_TEMPLATE = """# 🚀 AI Command Center Dashboard
+
+## 📊 Projects Overview
+{PROJECTS_START}
+| Type | Project Name | Link | Status |
+| :---: | :--- | :--- | :--- |
+{PROJECTS_END}
+
+## 📝 Scratchpad
+"""
+
+
+def _status_md(name, history):
+    lines = [
+        f"- `2026-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}` ✅ **INFO**: Seeded entry {i}"
+        for i in range(history, 0, -1)
+    ]
+    return (
+        f"# Project Status: {name}\n\n## 📍 Summary\n| Metric | Value |\n| :--- | :--- |\n"
+        f"| **Last Status** | 🚧 Working |\n| **Last Updated** | 2026-01-01 00:00:00 |\n\n"
+        f"## 📝 Activity Log (Latest on Top)\n{reporter_client.LOG_START}\n" + "\n".join(lines) +
+        f"\n{reporter_client.LOG_END}\n\n## 🛑 Blockers & Issues\n- None yet.\n"
+    )
+
+
+def _dashboard_files(rows):
+    projects = {
+        f"Proj{i:04d}": {"type": "☁️", "link": "(Local)", "status": "🚧 Working", "updated": None}
+        for i in range(rows)
+    }
+    template = DASHBOARD_TEMPLATE.format(PROJECTS_START=reporter_client.PROJECTS_START, PROJECTS_END=reporter_client.PROJECTS_END)
+    return {reporter_client.DASHBOARD_PATH: reporter_client._render_dashboard(template, projects)}
+
+
+def _reporter(repo_name):
+    with redirect_stdout(io.StringIO()):
+        return reporter_client.ProjectReporter(TOKEN, repo_name)
+
+
+def measure(fake, repo_name, fn, iterations):
+    """執行 fn(i) iterations 次，回傳統計結果"""
+    timings, calls, commits = [], 0, 0
+    for i in range(iterations):
+        before_calls, before_commits = len(fake.calls), fake.commit_count(repo_name)
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            fn(i)
+        timings.append((time.perf_counter() - started) * 1000)
+        calls += len(fake.calls) - before_calls
+        commits += fake.commit_count(repo_name) - before_commits
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "median_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "max_ms": round(timings[-1], 2),
+        "api_calls_per_op": round(calls / iterations, 2),
+        "commits_per_op": round(commits / iterations, 2),
+    }
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def bench_register(fake, iterations):
+    repo_name = f"{OWNER}/bench-register"
+    fake.create_repo(repo_name, _dashboard_files(10))
+    reporter = _reporter(repo_name)
+    yield "register", measure(fake, repo_name, lambda i: reporter.register(f"New{i:04d}"), iterations)
+
+
+def bench_log(fake, iterations):
+    for history in HISTORY_SIZES:
+        repo_name = f"{OWNER}/bench-log-{history}"
+        fake.create_repo(repo_name, {**_dashboard_files(10), "projects/Proj0000/STATUS.md": _status_md("Proj0000", history)})
+        reporter = _reporter(repo_name)
+        # 第一次寫入會觸發舊日誌封存，另外列出
+        yield f"log (history={history}, first)", measure(fake, repo_name, lambda i: reporter.log("Proj0000", "First entry"), 1)
+        yield f"log (history={history})", measure(fake, repo_name, lambda i: reporter.log("Proj0000", f"Entry {i}"), iterations)
+
+
+def bench_update_status(fake, iterations):
+    for rows in DASHBOARD_ROWS:
+        repo_name = f"{OWNER}/bench-status-{rows}"
+        fake.create_repo(repo_name, _dashboard_files(rows))
+        reporter = _reporter(repo_name)
+        rng = random.Random(rows)
+        yield f"update_status (rows={rows})", measure(
+            fake, repo_name, lambda i: reporter.update_status(f"Proj{rng.randrange(rows):04d}", f"🚧 Step {i}"), iterations
+        )
+
+
+def bench_memory(fake, iterations):
+    repo_name = f"{OWNER}/bench-memory"
+    rng = random.Random(0)
+    files = {
+        f"memory/topics/note{i:02d}.md": "".join(rng.choice("abcdefgh \n") for _ in range(MEMORY_FILE_SIZE))
+        for i in range(MEMORY_FILES)
+    }
+    fake.create_repo(repo_name, files)
+    saved_env = {k: os.environ.get(k) for k in ("GITHUB_TOKEN", "PRIVATE_DATA_REPO")}
+    saved_cwd = os.getcwd()
+    os.environ.update(GITHUB_TOKEN=TOKEN, PRIVATE_DATA_REPO=repo_name)
+    workdirs = []
+    try:
+        def cold_pull(i):
+            workdirs.append(tempfile.mkdtemp(prefix="bench-memory-"))
+            os.chdir(workdirs[-1])
+            memory_client.sync_memory("pull")
+
+        yield "memory_pull (cold)", measure(fake, repo_name, cold_pull, iterations)
+        yield "memory_pull (no changes)", measure(fake, repo_name, lambda i: memory_client.sync_memory("pull"), iterations)
+
+        def push_one(i):
+            with open(os.path.join("memory", "topics", "note00.md"), "a", encoding="utf-8") as f:
+                f.write(f"\nedit {i}\n")
+            memory_client.sync_memory("push")
+
+        yield "memory_push (1 file changed)", measure(fake, repo_name, push_one, iterations)
+    finally:
+        os.chdir(saved_cwd)
+        for path in workdirs:
+            shutil.rmtree(path, ignore_errors=True)
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+BENCHMARKS = {
+    "register": bench_register,
+    "log": bench_log,
+    "update_status": bench_update_status,
+    "memory": bench_memory,
+}
+
+
+def run(names=None, iterations=10, latency_ms=0.0, rate_limit=5000, throttle_every=0, write_throttle=1.0):
+    """
+    執行 benchmarks，回傳 [{"name", ...統計}]
+    write_throttle: 寫入之間的最小間隔秒數 (與 GitHub / PyGithub 相同的 1.0)；0 或 None 表示不節流
+    """
+    fake = FakeGitHub(owner=OWNER, latency=latency_ms / 1000, rate_limit=rate_limit, throttle_every=throttle_every).start()
+    saved_defaults = dict(github_pool.CLIENT_DEFAULTS)
+    github_pool.CLIENT_DEFAULTS.update(base_url=fake.base_url, seconds_between_writes=write_throttle or None)
+    # PRIVATE_DATA_REPO 會蓋過 ProjectReporter 的 repo 參數
+    saved_repo = os.environ.pop("PRIVATE_DATA_REPO", None)
+    # 在暫存目錄執行，避免 .agent/ 的 repo 快取與 spool 留在目前的 workspace
+    saved_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="bench-skills-")
+    os.chdir(workdir)
+    results = []
+    try:
+        for name in names or BENCHMARKS:
+            for label, stats in BENCHMARKS[name](fake, iterations):
+                stats["name"] = label
+                results.append(stats)
+                print(_format_row(stats))
+    finally:
+        fake.stop()
+        # 還原連線預設值，並丟棄連到 fake server 的共用 client
+        github_pool.CLIENT_DEFAULTS.clear()
+        github_pool.CLIENT_DEFAULTS.update(saved_defaults)
+        github_pool.reset(TOKEN)
+        os.chdir(saved_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        if saved_repo is not None:
+            os.environ["PRIVATE_DATA_REPO"] = saved_repo
+    return results
+
+
+def _format_row(stats):
+    return (f"{stats['name']:<32} {stats['iterations']:>5} {stats['median_ms']:>10.1f} {stats['p95_ms']:>10.1f} "
+            f"{stats['max_ms']:>10.1f} {stats['api_calls_per_op']:>10.1f} {stats['commits_per_op']:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the skill clients against a local fake GitHub API")
+    parser.add_argument("benchmarks", nargs="*", help=f"{', '.join(BENCHMARKS)} (預設全部執行)")
+    parser.add_argument("--iterations", type=int, default=10, help="每個項目的執行次數 (預設 10)")
+    parser.add_argument("--latency", type=float, default=0.0, help="每個 API 請求的延遲 (毫秒)")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="fake API 的 quota (用完後回應 403)")
+    parser.add_argument("--throttle-every", type=int, default=0, help="每 N 個請求注入一次 secondary rate limit")
+    parser.add_argument("--write-throttle", type=float, default=1.0,
+                        help="寫入之間的最小間隔秒數 (預設 1.0，與 GitHub / PyGithub 相同；0 表示不節流)")
+    parser.add_argument("--json", metavar="PATH", help="把結果寫成 JSON")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+
+    print(f"{'benchmark':<32} {'n':>5} {'median ms':>10} {'p95 ms':>10} {'max ms':>10} {'calls/op':>10} {'commits':>8}")
+    results = run(args.benchmarks, args.iterations, args.latency, args.rate_limit, args.throttle_every, args.write_throttle)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "latency_ms": args.latency,
+                "write_throttle": args.write_throttle,
+                "iterations": args.iterations,
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"💾 Results written to {args.json}")
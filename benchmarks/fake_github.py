@@ -0,0 +1,358 @@
+"""
+Fake GitHub API (benchmarks 用)
+在同一個 process 內啟動的 HTTP 伺服器，模擬 skills 用到的 GitHub REST API 子集：
+- repos / users / rate_limit
+- contents: GET (含目錄列表、ETag / 304)、PUT (create / update，SHA 不符時 409)
+- git data: refs (GET / PATCH，非 fast-forward 時 422)、commits、trees (含 base_tree、recursive)、blobs
+- commits/{ref}
+可注入延遲 (latency) 與 rate limit (quota 用完時 403、每 N 個請求一次 secondary rate limit)。
+
+    fake = FakeGitHub(latency=0.05).start()
+    fake.create_repo("tester/cc", {"DASHBOARD.md": "..."})
+    github_pool.CLIENT_DEFAULTS["base_url"] = fake.base_url
+"""
+
+import re
+import json
+import time
+import base64
+import hashlib
+import threading
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def blob_sha(data):
+    """與 git hash-object 相同的 blob SHA"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeGitHub:
+    def __init__(self, owner="tester", latency=0.0, rate_limit=5000, throttle_every=0, retry_after=1):
+        """
+        latency: 每個請求的延遲 (秒)
+        rate_limit: 每小時 quota；用完後回應 403 (primary rate limit)
+        throttle_every: 每 N 個請求回應一次 403 + Retry-After (secondary rate limit)，0 表示不注入
+        retry_after: secondary rate limit 的 Retry-After 秒數
+        """
+        self.owner = owner
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.lock = threading.RLock()
+        self.repos = {}
+        self.calls = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counters(self):
+        with self.lock:
+            self.calls = []
+            self.remaining = self.rate_limit
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def create_repo(self, full_name, files=None, branch="main"):
+        """建立 repo，files 為 {path: 文字內容}"""
+        repo = {"blobs": {}, "trees": {}, "commits": {}, "refs": {}, "branch": branch}
+        with self.lock:
+            self.repos[full_name] = repo
+            tree = {path: self._put_blob(repo, text.encode("utf-8")) for path, text in (files or {}).items()}
+            repo["refs"][branch] = self._put_commit(repo, self._put_tree(repo, tree), [], "init")
+        return repo
+
+    def write_files(self, full_name, files, message="seed"):
+        """直接以一個 commit 寫入多個檔案 (準備 benchmark 資料用，不計入 calls)"""
+        with self.lock:
+            repo = self.repos[full_name]
+            head = repo["refs"][repo["branch"]]
+            tree = dict(repo["trees"][repo["commits"][head]["tree"]])
+            for path, text in files.items():
+                tree[path] = self._put_blob(repo, text.encode("utf-8"))
+            repo["refs"][repo["branch"]] = self._put_commit(repo, self._put_tree(repo, tree), [head], message)
+
+    def head_tree(self, full_name):
+        repo = self.repos[full_name]
+        return repo["trees"][repo["commits"][repo["refs"][repo["branch"]]]["tree"]]
+
+    def read(self, full_name, path):
+        sha = self.head_tree(full_name).get(path)
+        return None if sha is None else self.repos[full_name]["blobs"][sha].decode("utf-8")
+
+    def commit_count(self, full_name):
+        repo = self.repos[full_name]
+        n, sha = 0, repo["refs"][repo["branch"]]
+        while sha:
+            parents = repo["commits"][sha]["parents"]
+            n += 1
+            sha = parents[0] if parents else None
+        return n
+
+    def _put_blob(self, repo, data):
+        sha = blob_sha(data)
+        repo["blobs"][sha] = data
+        return sha
+
+    def _put_tree(self, repo, entries):
+        sha = hashlib.sha1(json.dumps(sorted(entries.items())).encode()).hexdigest()
+        repo["trees"][sha] = dict(entries)
+        return sha
+
+    def _put_commit(self, repo, tree_sha, parents, message):
+        sha = hashlib.sha1(f"{tree_sha}{parents}{message}{time.time_ns()}".encode()).hexdigest()
+        repo["commits"][sha] = {"tree": tree_sha, "parents": parents, "message": message}
+        return sha
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # keep-alive 下 header 與 body 分開送出，不關 Nagle 會多出 ~40ms 的 delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=None, headers=None):
+                data = b"" if body is None else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-RateLimit-Limit", str(fake.rate_limit))
+                self.send_header("X-RateLimit-Remaining", str(max(fake.remaining, 0)))
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                n = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(n) or b"{}") if n else {}
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+            def _dispatch(self, verb):
+                body = self._body() if verb != "GET" else {}
+                if fake.latency:
+                    time.sleep(fake.latency)
+                url = urlparse(self.path)
+                with fake.lock:
+                    fake.calls.append((verb, unquote(url.path)))
+                    status, payload, headers = fake._limit(len(fake.calls))
+                    if status is None:
+                        status, payload, headers = fake.route(
+                            verb, unquote(url.path), parse_qs(url.query), body, dict(self.headers)
+                        )
+                    if status != 304:
+                        fake.remaining -= 1
+                self._send(status, payload, headers)
+
+        return Handler
+
+    def _limit(self, n):
+        """rate limit 注入：回傳 (status, body, headers)，不需限制時 status 為 None"""
+        if self.remaining <= 0:
+            return 403, {"message": "API rate limit exceeded for user."}, None
+        if self.throttle_every and n % self.throttle_every == 0:
+            return 403, {"message": "You have exceeded a secondary rate limit."}, {"Retry-After": str(self.retry_after)}
+        return None, None, None
+
+    def route(self, verb, path, query, body, headers):
+        if path == "/user":
+            return 200, {"login": self.owner, "url": f"{self.base_url}/user"}, None
+        m = re.match(r"^/users/([^/]+)$", path)
+        if m:
+            return 200, {"login": m.group(1), "url": f"{self.base_url}/users/{m.group(1)}"}, None
+        if path == "/rate_limit":
+            core = {"limit": self.rate_limit, "remaining": self.remaining, "reset": int(time.time()) + 3600, "used": 0}
+            return 200, {"resources": {"core": core}, "rate": core}, None
+
+        m = re.match(r"^/repos/([^/]+/[^/]+)(/.*)?$", path)
+        if not m or m.group(1) not in self.repos:
+            return 404, {"message": "Not Found"}, None
+        name, rest = m.group(1), m.group(2) or ""
+        repo = self.repos[name]
+        api = f"{self.base_url}/repos/{name}"
+        if rest == "":
+            return 200, {"full_name": name, "name": name.split("/")[1], "url": api,
+                         "owner": {"login": name.split("/")[0]}, "default_branch": repo["branch"]}, None
+
+        m = re.match(r"^/contents/?(.*)$", rest)
+        if m:
+            if verb == "GET":
+                return self._get_contents(repo, api, m.group(1), query, headers)
+            if verb == "PUT":
+                return self._put_contents(repo, api, m.group(1), body)
+
+        m = re.match(r"^/commits/(.+)$", rest)
+        if m:
+            csha = self._resolve(repo, m.group(1))
+            if csha is None:
+                return 404, {"message": "No commit found"}, None
+            c = repo["commits"][csha]
+            etag = f'"{csha}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, None, {"ETag": etag}
+            return 200, {"sha": csha, "commit": {"message": c["message"], "tree": {"sha": c["tree"]}}}, {"ETag": etag}
+
+        m = re.match(r"^/git/(?:ref|refs)/heads/(.+)$", rest)
+        if m:
+            branch = m.group(1)
+            if verb == "PATCH":
+                new, old = body["sha"], repo["refs"].get(branch)
+                if not body.get("force") and old != new and old not in repo["commits"][new]["parents"]:
+                    return 422, {"message": "Update is not a fast forward"}, None
+                repo["refs"][branch] = new
+            csha = repo["refs"].get(branch)
+            if csha is None:
+                return 404, {"message": "Not Found"}, None
+            return 200, {"ref": f"refs/heads/{branch}", "url": f"{api}/git/refs/heads/{branch}",
+                         "object": {"sha": csha, "type": "commit", "url": f"{api}/git/commits/{csha}"}}, None
+
+        m = re.match(r"^/git/commits(?:/([0-9a-f]+))?$", rest)
+        if m:
+            csha = self._put_commit(repo, body["tree"], body["parents"], body["message"]) if verb == "POST" else m.group(1)
+            if csha not in repo["commits"]:
+                return 404, {"message": "Not Found"}, None
+            c = repo["commits"][csha]
+            return (201 if verb == "POST" else 200), {
+                "sha": csha, "url": f"{api}/git/commits/{csha}", "message": c["message"],
+                "tree": {"sha": c["tree"], "url": f"{api}/git/trees/{c['tree']}"},
+                "parents": [{"sha": p, "url": f"{api}/git/commits/{p}"} for p in c["parents"]],
+            }, None
+
+        m = re.match(r"^/git/trees(?:/([^/]+))?$", rest)
+        if m:
+            if verb == "POST":
+                entries = dict(repo["trees"][body["base_tree"]]) if body.get("base_tree") else {}
+                for el in body["tree"]:
+                    if el.get("sha", "") is None:
+                        entries.pop(el["path"], None)
+                    elif "content" in el:
+                        entries[el["path"]] = self._put_blob(repo, el["content"].encode("utf-8"))
+                    else:
+                        entries[el["path"]] = el["sha"]
+                tsha = self._put_tree(repo, entries)
+            else:
+                tsha = m.group(1)
+                if tsha not in repo["trees"]:
+                    csha = self._resolve(repo, tsha)
+                    tsha = repo["commits"][csha]["tree"] if csha else tsha
+            if tsha not in repo["trees"]:
+                return 404, {"message": "Not Found"}, None
+            return (201 if verb == "POST" else 200), {
+                "sha": tsha, "url": f"{api}/git/trees/{tsha}", "truncated": False,
+                "tree": [{"path": p, "mode": "100644", "type": "blob", "sha": s, "size": len(repo["blobs"][s]),
+                          "url": f"{api}/git/blobs/{s}"} for p, s in sorted(repo["trees"][tsha].items())],
+            }, None
+
+        m = re.match(r"^/git/blobs(?:/([0-9a-f]+))?$", rest)
+        if m:
+            if verb == "POST":
+                raw = body["content"]
+                data = raw.encode("utf-8") if body.get("encoding") == "utf-8" else base64.b64decode(raw)
+                sha = self._put_blob(repo, data)
+                return 201, {"sha": sha, "url": f"{api}/git/blobs/{sha}"}, None
+            sha = m.group(1)
+            if sha not in repo["blobs"]:
+                return 404, {"message": "Not Found"}, None
+            data = repo["blobs"][sha]
+            return 200, {"sha": sha, "encoding": "base64", "content": base64.b64encode(data).decode(),
+                         "size": len(data), "url": f"{api}/git/blobs/{sha}"}, None
+
+        return 404, {"message": "Not Found"}, None
+
+    def _resolve(self, repo, ref):
+        """branch 名稱或 commit SHA → commit SHA"""
+        ref = ref.replace("refs/heads/", "")
+        if ref in ("HEAD", ""):
+            ref = repo["branch"]
+        sha = repo["refs"].get(ref, ref)
+        return sha if sha in repo["commits"] else None
+
+    def _get_contents(self, repo, api, fpath, query, headers):
+        csha = self._resolve(repo, query.get("ref", [repo["branch"]])[0])
+        if csha is None:
+            return 404, {"message": "No commit found"}, None
+        tree = repo["trees"][repo["commits"][csha]["tree"]]
+        if fpath in tree:
+            sha = tree[fpath]
+            etag = f'"{sha}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, None, {"ETag": etag}
+            data = repo["blobs"][sha]
+            return 200, {
+                "type": "file", "encoding": "base64", "path": fpath, "name": fpath.split("/")[-1],
+                "sha": sha, "size": len(data), "content": base64.b64encode(data).decode(),
+                "url": f"{api}/contents/{fpath}",
+            }, {"ETag": etag}
+
+        # 目錄列表：子目錄的 sha 為該子樹的 tree SHA
+        prefix = fpath.rstrip("/") + "/" if fpath else ""
+        children = {}
+        for path, sha in tree.items():
+            if path.startswith(prefix):
+                head, _, rest = path[len(prefix):].partition("/")
+                children.setdefault(head, {})[rest] = sha
+        if not children:
+            return 404, {"message": "Not Found"}, None
+        listing = []
+        for name, entries in sorted(children.items()):
+            if "" in entries:
+                listing.append({"name": name, "path": prefix + name, "type": "file", "sha": entries[""]})
+            else:
+                listing.append({"name": name, "path": prefix + name, "type": "dir", "sha": self._put_tree(repo, entries)})
+        etag = '"' + hashlib.sha1(json.dumps(listing).encode()).hexdigest() + '"'
+        if headers.get("If-None-Match") == etag:
+            return 304, None, {"ETag": etag}
+        return 200, listing, {"ETag": etag}
+
+    def _put_contents(self, repo, api, fpath, body):
+        head = repo["refs"][repo["branch"]]
+        tree = dict(repo["trees"][repo["commits"][head]["tree"]])
+        current = tree.get(fpath)
+        if current is not None and body.get("sha") is None:
+            return 422, {"message": "\"sha\" wasn't supplied."}, None
+        if body.get("sha") != current:
+            return 409, {"message": f"{fpath} does not match {body.get('sha')}"}, None
+        sha = self._put_blob(repo, base64.b64decode(body["content"]))
+        tree[fpath] = sha
+        csha = self._put_commit(repo, self._put_tree(repo, tree), [head], body.get("message", ""))
+        repo["refs"][repo["branch"]] = csha
+        return (201 if current is None else 200), {
+            "content": {"type": "file", "name": fpath.split("/")[-1], "path": fpath, "sha": sha, "url": f"{api}/contents/{fpath}"},
+            "commit": {"sha": csha, "url": f"{api}/git/commits/{csha}"},
+        }, None
@@ -0,0 +1,419 @@
+"""
+Local Mirror Backend for ProjectReporter
+以 Command Center repo 的本地 bare mirror 作為 ProjectReporter 的儲存後端：
+- 回報直接 commit 到本地 mirror (不連網)，snapshot() 也從 mirror 讀取
+- 排程器每 PUSH_INTERVAL 秒、或累積 PUSH_EVERY 個 commit 時推送一次
+- push 被拒 (遠端有新的 commit) 時 fetch，把尚未推送的回報重新套用到遠端最新版本上 (rebase)
+- 同一台機器上的多個 agent 可以共用同一個 mirror (以檔案鎖序列化寫入)
+
+    from local_mirror import LocalMirror
+    mirror = LocalMirror(os.path.expanduser("~/.cache/agent-skills/command-center.git"),
+                         "https://github.com/owner/AI_Command_Center.git")
+    reporter = ProjectReporter(TOKEN, REPO, backend=mirror)
+    mirror.start()      # 背景定期 push；程式結束前會再 push 一次
+
+remote 也可以是本地的 bare repo (測試用)：LocalMirror("/tmp/mirror.git", "/tmp/remote.git")
+命令列：python local_mirror.py push|status <mirror path>
+"""
+
+import os
+import sys
+import json
+import atexit
+import argparse
+import threading
+import subprocess
+from contextlib import contextmanager
+
+# 排程器的預設推送間隔 (秒) 與累積多少個 commit 就提早推送
+PUSH_INTERVAL = 30
+PUSH_EVERY = 20
+
+# push 被拒後 fetch + rebase 的最多次數
+MAX_PUSH_RETRIES = 5
+
+# mirror 目錄中的檔案：尚未推送的回報 (rebase 時重新套用) 與跨 process 的寫入鎖
+JOURNAL_NAME = "reporter-journal.jsonl"
+LOCK_NAME = "reporter.lock"
+
+# mirror 沒有設定 user.name / user.email 時使用的 commit 身分
+DEFAULT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "AI Command Center Reporter",
+    "GIT_AUTHOR_EMAIL": "reporter@localhost",
+    "GIT_COMMITTER_NAME": "AI Command Center Reporter",
+    "GIT_COMMITTER_EMAIL": "reporter@localhost",
+}
+
+_ZERO_SHA = "0" * 40
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:
+    # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                pass  # LK_LOCK 重試 10 秒後放棄，繼續等待
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class MirrorError(Exception):
+    """mirror 無法完成操作 (例如沒有 replayer 時遇到無法自動 rebase 的衝突)"""
+
+
+class LocalMirror:
+    def __init__(self, path, remote_url=None, branch=None):
+        """
+        path: bare mirror 的路徑；不存在時從 remote_url clone (沒有 remote_url 則建立空的 bare repo)
+        branch: 回報寫入的分支 (預設為 mirror 的 HEAD)
+        """
+        self.path = os.path.abspath(path)
+        if not os.path.isdir(self.path):
+            self._create(remote_url)
+        self.branch = branch or _git(self.path, "symbolic-ref", "--short", "HEAD")
+        self.has_remote = _run(self.path, "remote", "get-url", "origin").returncode == 0
+
+        # ProjectReporter 在使用此 backend 時設定：replayer(ops, title) 重新套用一批回報
+        self.replayer = None
+
+        self._env = dict(os.environ)
+        if _run(self.path, "config", "user.email").returncode != 0:
+            for key, value in DEFAULT_IDENTITY.items():
+                self._env.setdefault(key, value)
+
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+        self._trees = {}   # commit sha -> {path: blob sha}
+        self._blobs = {}   # blob sha -> content
+        self._unpushed = len(self._read_journal())
+        self._push_every = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _create(self, remote_url):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if remote_url:
+            print(f"📥 Creating local mirror of {remote_url} at {self.path}...")
+            subprocess.run(["git", "clone", "--bare", "--quiet", remote_url, self.path],
+                           check=True, capture_output=True, text=True)
+            branch = _git(self.path, "symbolic-ref", "--short", "HEAD")
+            head = self._resolve(f"refs/heads/{branch}")
+            if head:
+                _git(self.path, "update-ref", f"refs/remotes/origin/{branch}", head)
+        else:
+            subprocess.run(["git", "init", "--bare", "--quiet", self.path], check=True, capture_output=True, text=True)
+
+    # ------------------------------------------------------------------
+    # Locking
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self):
+        """跨 thread 與 process 的寫入鎖 (同一個 thread 可重入)"""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self._lock_handle = open(os.path.join(self.path, LOCK_NAME), "a+")
+                _lock_file(self._lock_handle)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    _unlock_file(self._lock_handle)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def _resolve(self, ref):
+        result = _run(self.path, "rev-parse", "--verify", "--quiet", ref)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def head(self):
+        """目前分支的 commit sha (空的 mirror 回傳 None)"""
+        return self._resolve(f"refs/heads/{self.branch}")
+
+    def _tracking(self):
+        return self._resolve(f"refs/remotes/origin/{self.branch}")
+
+    def files(self, commit=None):
+        """回傳 {path: blob sha} (預設為目前分支)"""
+        commit = commit or self.head()
+        if commit is None:
+            return {}
+        if commit not in self._trees:
+            files = {}
+            for entry in _git(self.path, "ls-tree", "-r", "-z", commit, strip=False).split("\0"):
+                if not entry:
+                    continue
+                meta, path = entry.split("\t", 1)
+                _mode, kind, sha = meta.split()
+                if kind == "blob":
+                    files[path] = sha
+            self._trees[commit] = files
+        return self._trees[commit]
+
+    def read(self, path, commit=None):
+        """讀取檔案，回傳 (content, blob sha)；不存在時回傳 None"""
+        sha = self.files(commit).get(path)
+        if sha is None:
+            return None
+        if sha not in self._blobs:
+            data = subprocess.run(["git", "-C", self.path, "cat-file", "blob", sha],
+                                  check=True, capture_output=True).stdout
+            self._blobs[sha] = data.decode("utf-8")
+        return self._blobs[sha], sha
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def update(self, build, ops=None, title=None):
+        """
+        在寫入鎖內以目前的分支呼叫 build(read)，把結果 commit 到 mirror：
+            build(read) -> ({path: content}, commit message) 或 None (沒有變動)
+        ops/title: 記入 journal，push 被拒時交給 replayer 重新套用
+        回傳新的 commit sha (沒有變動時為 None)
+        """
+        with self._locked():
+            head = self.head()
+            result = build(lambda path: self.read(path, head))
+            if not result:
+                return None
+            files, message = result
+            blobs = {}
+            for path, content in files.items():
+                # 以 bytes 寫入，避免 Windows 的換行轉換改變內容
+                blobs[path] = subprocess.run(["git", "-C", self.path, "hash-object", "-w", "--stdin"], check=True,
+                                             capture_output=True, input=content.encode("utf-8")).stdout.decode().strip()
+                self._blobs[blobs[path]] = content
+            commit = self._commit(head, blobs, message)
+            self._append_journal({"commit": commit, "ops": ops, "title": title})
+            self._unpushed += 1
+        if self._push_every and self._unpushed >= self._push_every:
+            self._wake.set()
+        return commit
+
+    def _commit(self, parent, blobs, message, advance=True):
+        """
+        以 parent 的 tree 加上 blobs ({path: blob sha}，None 表示刪除) 建立 commit；
+        advance=True 時並把分支從 parent 推進到新的 commit
+        """
+        env = dict(self._env, GIT_INDEX_FILE=os.path.join(self.path, f"reporter-index-{os.getpid()}-{threading.get_ident()}"))
+        try:
+            if parent:
+                _git(self.path, "read-tree", parent, env=env)
+            else:
+                _git(self.path, "read-tree", "--empty", env=env)
+            index_info = "".join(
+                f"0 {_ZERO_SHA}\t{path}\n" if sha is None else f"100644 {sha}\t{path}\n"
+                for path, sha in blobs.items()
+            )
+            _git(self.path, "update-index", "--index-info", input=index_info, env=env)
+            tree = _git(self.path, "write-tree", env=env)
+        finally:
+            try:
+                os.remove(env["GIT_INDEX_FILE"])
+            except OSError:
+                pass
+        parents = ["-p", parent] if parent else []
+        commit = _git(self.path, "commit-tree", tree, *parents, "-F", "-", input=message, env=self._env)
+        if advance:
+            # 以舊值做 compare-and-swap，防止在鎖外被改動
+            _git(self.path, "update-ref", f"refs/heads/{self.branch}", commit, parent or _ZERO_SHA)
+        return commit
+
+    # ------------------------------------------------------------------
+    # Journal (尚未推送的回報)
+    # ------------------------------------------------------------------
+
+    def _read_journal(self):
+        entries = []
+        try:
+            with open(os.path.join(self.path, JOURNAL_NAME), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entries.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _append_journal(self, entry):
+        with open(os.path.join(self.path, JOURNAL_NAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _write_journal(self, entries):
+        path = os.path.join(self.path, JOURNAL_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(path + ".tmp", path)
+        self._unpushed = len(entries)
+
+    # ------------------------------------------------------------------
+    # Push / rebase
+    # ------------------------------------------------------------------
+
+    def pending(self):
+        """尚未推送的 commit 數"""
+        head, tracking = self.head(), self._tracking()
+        if head is None or head == tracking:
+            return 0
+        span = f"{tracking}..{head}" if tracking else head
+        return int(_git(self.path, "rev-list", "--count", span))
+
+    def push(self):
+        """
+        把尚未推送的 commit 推到遠端。被拒時 fetch 並 rebase 後重試 (最多 MAX_PUSH_RETRIES 次)。
+        回傳 True 表示遠端已是最新 (包含沒有東西要推)。
+        """
+        if not self.has_remote:
+            return True
+        for attempt in range(MAX_PUSH_RETRIES + 1):
+            head = self.head()
+            if head is None or head == self._tracking():
+                return True
+            # push 期間不持有鎖，agent 仍可繼續 commit；只推送當下的 head
+            result = _run(self.path, "push", "--quiet", "origin", f"{head}:refs/heads/{self.branch}")
+            if result.returncode == 0:
+                with self._locked():
+                    _git(self.path, "update-ref", f"refs/remotes/origin/{self.branch}", head)
+                    entries = self._read_journal()
+                    pushed = [e["commit"] for e in entries].index(head) + 1 if any(e["commit"] == head for e in entries) else 0
+                    self._write_journal(entries[pushed:])
+                print(f"📤 Pushed local mirror to origin/{self.branch} ({head[:7]})")
+                return True
+
+            with self._locked():
+                fetch = _run(self.path, "fetch", "--quiet", "origin", f"+refs/heads/{self.branch}:refs/remotes/origin/{self.branch}")
+                if fetch.returncode != 0 or _run(self.path, "merge-base", "--is-ancestor", self._tracking(), head).returncode == 0:
+                    # 遠端沒有分岔：不是衝突 (網路、權限...)，保留到下次
+                    print(f"❌ Push failed: {(result.stderr or fetch.stderr).strip()}")
+                    return False
+                print(f"🔀 origin/{self.branch} moved, rebasing {self.pending()} local commit(s) (attempt {attempt + 1})...")
+                self._rebase()
+        print(f"❌ Push still rejected after {MAX_PUSH_RETRIES} rebases, will retry later.")
+        return False
+
+    def _rebase(self):
+        """把本地尚未推送的 commit 移到 origin 最新版本之上 (需持有寫入鎖)"""
+        head, remote = self.head(), self._tracking()
+        base = _git(self.path, "merge-base", head, remote)
+        commits = _git(self.path, "rev-list", "--reverse", f"{base}..{head}").split()
+        entries = self._read_journal()
+
+        if self.replayer is not None and [e["commit"] for e in entries] == commits and all(e["ops"] for e in entries):
+            # 語意層級的 rebase：以最新內容重新套用回報 (與 ProjectReporter 處理 409/422 的方式相同)
+            _git(self.path, "update-ref", f"refs/heads/{self.branch}", remote, head)
+            self._write_journal([])
+            try:
+                for entry in entries:
+                    self.replayer(entry["ops"], entry["title"])
+            except Exception:
+                # 還原成 rebase 前的狀態，下次再試
+                _git(self.path, "update-ref", f"refs/heads/{self.branch}", head)
+                self._write_journal(entries)
+                raise
+            return
+
+        # 檔案層級的 rebase：只在本地與遠端改到不同檔案時可行
+        remote_changed = set(_git(self.path, "diff-tree", "-r", "--name-only", base, remote).split("\n")) - {""}
+        new_head, mapping = remote, {}
+        for commit in commits:
+            # -z 輸出：":old_mode new_mode old_sha new_sha status\0path\0" 重複
+            tokens = _git(self.path, "diff-tree", "-r", "--no-commit-id", "-z", f"{commit}^", commit, strip=False).split("\0")
+            blobs = {}
+            for meta, path in zip(tokens[0::2], tokens[1::2]):
+                _old_mode, _new_mode, _old_sha, new_sha, status = meta.lstrip(":").split()
+                blobs[path] = None if status == "D" else new_sha
+            conflicts = sorted(set(blobs) & remote_changed)
+            if conflicts:
+                raise MirrorError(f"Local commit {commit[:7]} conflicts with remote changes to {', '.join(conflicts)}; "
+                                  "push from a ProjectReporter using this mirror to rebase the reports")
+            message = _git(self.path, "log", "-1", "--format=%B", commit)
+            new_head = self._commit(new_head, blobs, message, advance=False)
+            mapping[commit] = new_head
+        _git(self.path, "update-ref", f"refs/heads/{self.branch}", new_head, head)
+        self._write_journal([dict(e, commit=mapping.get(e["commit"], e["commit"])) for e in entries])
+
+    # ------------------------------------------------------------------
+    # Scheduler
+    # ------------------------------------------------------------------
+
+    def start(self, interval=PUSH_INTERVAL, every=PUSH_EVERY):
+        """
+        啟動背景推送：每 interval 秒、或本 process 累積 every 個未推送的 commit 時推送。
+        程式結束前 (atexit) 會再推送一次。
+        """
+        if self._thread is not None:
+            return
+        self._push_every = every
+        self._stopped.clear()
+
+        def loop():
+            while not self._stopped.is_set():
+                self._wake.wait(interval)
+                self._wake.clear()
+                if self._stopped.is_set():
+                    break
+                try:
+                    self.push()
+                except Exception as e:
+                    print(f"❌ Background push failed: {e}")
+
+        self._thread = threading.Thread(target=loop, name="mirror-push", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """停止背景推送，並把剩下的 commit 推送出去"""
+        if self._thread is not None:
+            self._stopped.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        return self.push()
+
+
+def _run(path, *args, input=None, env=None):
+    return subprocess.run(["git", "-C", path, *args], capture_output=True, text=True, input=input, env=env)
+
+
+def _git(path, *args, input=None, env=None, strip=True):
+    """在 path 中執行 git 指令並回傳 stdout (失敗時丟出 CalledProcessError)"""
+    result = subprocess.run(["git", "-C", path, *args], check=True, capture_output=True, text=True,
+                            input=input, env=env, encoding="utf-8")
+    return result.stdout.strip() if strip else result.stdout
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mirror for the AI Command Center reporter")
+    parser.add_argument("action", choices=["push", "status"])
+    parser.add_argument("mirror", help="bare mirror 路徑")
+    args = parser.parse_args()
+
+    mirror = LocalMirror(args.mirror)
+    if args.action == "push":
+        sys.exit(0 if mirror.push() else 1)
+    else:
+        print(f"🗄️ {mirror.path} [{mirror.branch}] head={(mirror.head() or '-')[:7]} unpushed={mirror.pending()}")
@@ -1,15 +1,200 @@
-
 """
 AI Command Center - Advanced Reporter Client (v3)
 支援寫入個別專案的 STATUS.md 日誌檔。
 支援從 config.json 讀取設定。
+支援 batch / 背景佇列 / 離線 spool 與 snapshot() 讀取，各功能的用法見 SKILL.md。
 """
 
 import os
+import sys
 import json
-from github import Github
+import inspect
+import argparse
+import base64
+import hashlib
+import queue
+import atexit
+import threading
+import time
+import uuid
+import random
+import re
+from contextlib import contextmanager, nullcontext
+import warnings
+from urllib.parse import quote
 from datetime import datetime
-import pytz # 需要 pip install pytz
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _github():
+    """延遲載入 PyGithub (import 本身約需 0.25 秒)，第一次真正連線時才載入"""
+    import github
+    return github
+
+
+# 共用 GitHub 連線層 (common/github_pool.py)
+_SKILL_DIR = os.path.dirname(os.path.abspath(__file__)) if "__file__" in globals() else os.path.join(".agent", "skills", "command_center_reporter")
+_COMMON_DIR = os.path.join(os.path.dirname(_SKILL_DIR), "common")
+if _COMMON_DIR not in sys.path:
+    sys.path.insert(0, _COMMON_DIR)
+try:
+    from github_pool import get_github, get_budget
+except ImportError:
+    # 以 exec() 單獨載入本檔時可能沒有共用模組，退回一般的 Github 物件
+    get_budget = None
+
+    def get_github(token, **kwargs):
+        return _github().Github(token, **kwargs)
+
+# DASHBOARD.md 內嵌專案索引的格式 (與 workspace_manager 共用)
+from dashboard_index import render_index, parse_index as _parse_dashboard_index
+
+try:
+    from metrics import operation, count as count_metric, wrap as metrics_wrap
+except ImportError:
+    # 沒有共用模組時不量測
+    def operation(name, **labels):
+        return nullcontext()
+
+    def count_metric(key, n=1):
+        pass
+
+    def metrics_wrap(fn):
+        return fn
+
+LOG_START = "<!-- LOG_START -->"
+LOG_END = "<!-- LOG_END -->"
+
+# Dashboard 的結構化索引 (SSOT) 以 HTML 註解內嵌在 DASHBOARD.md 的 PROJECTS_START/END 之間，
+# 專案表格由它產生；索引與表格在同一個檔案，update_status()/register() 只需寫入一個檔案
+DASHBOARD_PATH = "DASHBOARD.md"
+PROJECTS_START = "<!-- PROJECTS_START -->"
+PROJECTS_END = "<!-- PROJECTS_END -->"
+
+# 表格行：| Type | **Project Name** | Link | Status |
+_ROW_RE = re.compile(r"^\|\s*(.*?)\s*\|\s*\*\*(.+?)\*\*\s*\|\s*(.*?)\s*\|\s*(.*?)\s*\|\s*$")
+_TABLE_SEP_RE = re.compile(r"^\|(\s*:?-+:?\s*\|)+\s*$")
+
+# STATUS.md 保留的日誌筆數，超過的部分依月份封存 (None/0 表示不封存)
+HOT_LOG_ENTRIES = 50
+# 日誌超過 HOT_LOG_ENTRIES * LOG_ROTATE_FACTOR 筆時才封存 (一次移走多筆，再減回 HOT_LOG_ENTRIES 筆)，
+# 避免每次 log() 都只搬一行而變成 STATUS.md + 月份檔 + INDEX.md 的三檔 commit
+LOG_ROTATE_FACTOR = 2
+
+# 背景 worker 收到第一筆回報後，再等待這麼久以收集同一波的其他回報
+COALESCE_WINDOW = 0.5
+
+# 送不出去的回報會 append 到這個檔案 (相對於 workspace 根目錄)
+DEFAULT_SPOOL_PATH = os.path.join(".agent", "reporter_spool.jsonl")
+
+# 已解析的 repo 資訊 (短名稱 → owner/name、default branch)，讓下次啟動不必再查詢
+REPO_CACHE_PATH = os.path.join(".agent", "reporter_repos.json")
+
+# 寫入衝突 (SHA 過期 / ref 非 fast-forward) 時的重試次數與退避基準秒數
+MAX_CONFLICT_RETRIES = 6
+CONFLICT_BACKOFF = 0.5
+
+# snapshot() 同時讀取 blob 的數量
+SNAPSHOT_WORKERS = 16
+
+_STATUS_PATH_RE = re.compile(r"^projects/([^/]+)/STATUS\.md$")
+_SUMMARY_RE = re.compile(r"^\|\s*\*\*(Last Status|Last Updated)\*\*\s*\|\s*(.*?)\s*\|\s*$", re.M)
+_LOG_LINE_RE = re.compile(r"^- `([^`]*)`\s*(\S*)\s*\*\*(\w+)\*\*:\s*(.*?)\s*(?:<!-- op:\w+ -->)?\s*$")
+
+
+class _ContentCache:
+    """
+    檔案內容快取：(scope, path) -> (content, blob sha, etag)。
+    scope 為 (API base URL, token hash, repo)，見 _cache_scope()；同一個程序中不同 token 或
+    不同的 GitHub (例如 GHE) 不會共用項目。
+    - 讀取的項目以 If-None-Match 重新驗證，304 不消耗流量也不計入 rate limit；
+      沒有 ETag 的回應無法重新驗證，因此不快取。
+    - 自己剛寫入的項目沒有 ETag，直接信任快取；若 SHA 已過期，寫入時會收到
+      409/422，呼叫端再 invalidate() 並重新讀取。
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, scope, path):
+        with self._lock:
+            return self._entries.get((scope, path))
+
+    def put(self, scope, path, content, sha, etag=None):
+        with self._lock:
+            self._entries[(scope, path)] = (content, sha, etag)
+
+    def invalidate(self, scope, path):
+        with self._lock:
+            self._entries.pop((scope, path), None)
+
+
+_CACHE = _ContentCache()
+
+
+def _git_blob_sha(content):
+    """與 git hash-object 相同的 blob SHA，用來在本地推算剛寫入檔案的 SHA"""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _cache_scope(github, token, repo_name):
+    """_CACHE 的 scope：API base URL、token 的 hash (不存 token 本身)、repo 名稱"""
+    return (github.requester.base_url, hashlib.sha256((token or "").encode("utf-8")).hexdigest()[:12], repo_name)
+
+
+def _get_contents(repo, path, etag=None):
+    """
+    GET /repos/{repo}/contents/{path}，回傳 (response headers, json)；304 時 json 為 None。
+    PyGithub 的 get_contents() 不支援 If-None-Match，因此改用 Requester (PyGithub 2.x 為
+    「呼叫尚未支援的端點」提供的公開介面)。只有這裡依賴 Requester，升級 PyGithub 時只需檢查此函式。
+    """
+    headers = {"If-None-Match": etag} if etag else None
+    return repo.requester.requestJsonAndCheck("GET", f"{repo.url}/contents/{quote(path)}", headers=headers)
+
+
+def _fetch_file(repo, path, scope):
+    """
+    讀取 repo 中的檔案，回傳 (content, sha)；不存在時回傳 None。
+    優先使用 _CACHE，必要時送出帶 If-None-Match 的條件請求。
+    scope: 快取鍵的範圍 (見 _cache_scope)
+    """
+    cached = _CACHE.get(scope, path)
+    if cached and cached[2] is None:
+        return cached[0], cached[1]
+
+    try:
+        resp_headers, data = _get_contents(repo, path, cached[2] if cached else None)
+    except _github().GithubException as e:
+        if e.status == 404:
+            _CACHE.invalidate(scope, path)
+            return None
+        raise
+
+    if data is None:
+        # 304 Not Modified
+        return cached[0], cached[1]
+
+    content = base64.b64decode(data["content"]).decode("utf-8")
+    if resp_headers.get("etag"):
+        _CACHE.put(scope, path, content, data["sha"], resp_headers["etag"])
+    else:
+        _CACHE.invalidate(scope, path)
+    return content, data["sha"]
+
+
+def _repo_cache_key(token, name):
+    # 短名稱的 owner 取決於 token，因此以 token 的 hash (不存 token 本身) 區分
+    return f"{hashlib.sha256((token or '').encode('utf-8')).hexdigest()[:12]}:{name}"
+
+
+def _load_repo_cache():
+    try:
+        with open(REPO_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
 
 def resolve_config(github_token, config_repo_name=None):
     """
@@ -30,10 +215,12 @@ def resolve_config(github_token, config_repo_name=None):
 
     if repo_to_check:
         try:
-            g = Github(github_token)
+            g = get_github(github_token)
             repo = g.get_repo(repo_to_check)
-            config_content = repo.get_contents("config.json")
-            remote_config = json.loads(config_content.decoded_content.decode("utf-8"))
+            config_file = _fetch_file(repo, "config.json", _cache_scope(g, github_token, repo.full_name))
+            if config_file is None:
+                raise FileNotFoundError("config.json not found")
+            remote_config = json.loads(config_file[0])
             config.update(remote_config)
             print(f"✅ Loaded config from {repo_to_check}")
         except Exception as e:
@@ -42,106 +229,169 @@ def resolve_config(github_token, config_repo_name=None):
     return config
 
 class ProjectReporter:
-    def __init__(self, github_token, target_repo_name=None):
+    def __init__(self, github_token, target_repo_name=None, background=False,
+                 offline=False, spool_path=DEFAULT_SPOOL_PATH, max_log_entries=HOT_LOG_ENTRIES,
+                 lazy=False, backend=None):
         """
         初始化 Reporter Client.
         target_repo_name: 明確指定要寫入數據的 Repo。如果為 None，則嘗試從 Config 或 Envs 自動偵測。
+        background: True 時 log()/update_status()/register() 立即返回，
+                    由背景 thread 合併後批次送出 (見 flush())。
+        offline: True 時所有回報只寫入 spool，稍後再以 replay() 同步。
+        spool_path: 失敗/延後回報的 JSONL 日誌路徑。
+        max_log_entries: STATUS.md 保留的日誌筆數，較舊的移到 projects/{name}/log/ 封存
+                         (超過 max_log_entries * LOG_ROTATE_FACTOR 筆時才封存一次)。
+        lazy: True 時不在建構時連網；repo 名稱與 default branch 優先取自 REPO_CACHE_PATH
+              (解析結果也只在 lazy=True 時寫回)，其餘連線延到第一次寫入時才進行。
+        backend: 儲存後端，例如 local_mirror.LocalMirror；設定時所有讀寫都經由 backend，
+                 不使用 GitHub API (github_token 可為 None)。
         """
-        self.g = Github(github_token)
-        
+        self._token = github_token
+        self.backend = backend
+        if backend is not None:
+            # push 被拒時，backend 以最新內容重新套用尚未推送的回報
+            backend.replayer = self._write_backend
+        self._g = None
+        self._repo = None
+        self._tz = None
+
         # 1. Resolve Configuration first
         repo_from_env = os.environ.get("PRIVATE_DATA_REPO") or target_repo_name
         
         # 2. Determine target Data Repo
         if not repo_from_env:
             raise ValueError("❌ No Data Repository specified! Please set 'PRIVATE_DATA_REPO' environment variable or pass repo name.")
-            
-        if "/" not in repo_from_env:
-             # Handle incomplete names like "my-data-repo" -> "user/my-data-repo"
-             user = self.g.get_user()
-             self.repo_name = f"{user.login}/{repo_from_env}"
+
+        self._lazy = lazy
+        self._repo_info = _load_repo_cache().get(_repo_cache_key(github_token, repo_from_env), {}) if lazy else {}
+        self._short_name = None
+        if "/" in repo_from_env:
+            self._repo_name = repo_from_env
         else:
-            self.repo_name = repo_from_env
-            
-        print(f"📡 Connecting to Data Repository: {self.repo_name}...")
-        self.repo = self.g.get_repo(self.repo_name)
-        
+            # Handle incomplete names like "my-data-repo" -> "user/my-data-repo" (resolved on first use)
+            self._short_name = repo_from_env
+            self._repo_name = self._repo_info.get("full_name")
+
+        if not lazy and backend is None:
+            print(f"📡 Connecting to Data Repository: {self.repo_name}...")
+            self._repo = self.g.get_repo(self.repo_name)
+            self._remember_repo(default_branch=self._repo.default_branch)
+
+        self.max_log_entries = max_log_entries
+
+        # 離線 spool (append-only JSONL)
+        self.offline = offline
+        self.spool_path = spool_path
+        self._spool_lock = threading.Lock()
+
+        # batch() 區塊內暫存的操作；None 表示直接寫入模式
+        self._batch = None
+        self._batch_result = None
+
+        # 背景模式：佇列 + 單一 worker thread，程式結束前自動 flush
+        self._queue = None
+        if background:
+            self._queue = queue.Queue()
+            threading.Thread(target=self._worker, name="reporter-worker", daemon=True).start()
+            atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # Lazy connection
+    # ------------------------------------------------------------------
+
+    @property
+    def g(self):
+        if self._g is None:
+            self._g = get_github(self._token)
+        return self._g
+
+    @property
+    def _cache_scope(self):
+        return _cache_scope(self.g, self._token, self.repo_name)
+
+    @property
+    def _budget(self):
+        return get_budget(self._token) if get_budget else None
+
+    @property
+    def repo_name(self):
+        if self._repo_name is None:
+            self._repo_name = f"{self.g.get_user().login}/{self._short_name}"
+            self._remember_repo()
+        return self._repo_name
+
+    @property
+    def repo(self):
+        if self._repo is None:
+            with warnings.catch_warnings():
+                # PyGithub 2.x 建議改用 Github(lazy=True)，但共用的 client 不應整個變成 lazy
+                warnings.simplefilter("ignore", DeprecationWarning)
+                self._repo = self.g.get_repo(self.repo_name, lazy=True)
+        return self._repo
+
+    @property
+    def default_branch(self):
+        if "default_branch" not in self._repo_info:
+            self._remember_repo(default_branch=self.repo.default_branch)
+        return self._repo_info["default_branch"]
+
+    @property
+    def tz(self):
         # 設定時區 (Taipei)
-        self.tz = pytz.timezone('Asia/Taipei')
+        if self._tz is None:
+            import pytz  # 需要 pip install pytz
+            self._tz = pytz.timezone('Asia/Taipei')
+        return self._tz
+
+    def _remember_repo(self, **info):
+        """記住解析出的 repo 資訊；lazy=True 時寫入 REPO_CACHE_PATH，一般模式不在工作目錄留下檔案"""
+        self._repo_info.update(info, full_name=self.repo_name)
+        if not self._lazy:
+            return
+        key = _repo_cache_key(self._token, self._short_name or self.repo_name)
+        try:
+            cache = _load_repo_cache()
+            cache[key] = self._repo_info
+            os.makedirs(os.path.dirname(REPO_CACHE_PATH) or ".", exist_ok=True)
+            tmp = f"{REPO_CACHE_PATH}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp, REPO_CACHE_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not write {REPO_CACHE_PATH}: {e}")
 
     def _get_time_str(self):
         return datetime.now(self.tz).strftime("%Y-%m-%d %H:%M:%S")
 
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
     def log(self, project_name, message, level="INFO"):
         """
         將詳細日誌寫入 projects/{project_name}/STATUS.md
         """
-        status_file_path = f"projects/{project_name}/STATUS.md"
-        
-        try:
-            contents = self.repo.get_contents(status_file_path)
-            content_str = contents.decoded_content.decode("utf-8")
-            
-            # 使用標記 <!-- LOG_START --> 來定位插入點
-            insert_marker = "<!-- LOG_START -->"
-            
-            if insert_marker in content_str:
-                timestamp = self._get_time_str()
-                icon = "ℹ️" if level=="INFO" else "⚠️" if level=="WARN" else "✅"
-                log_entry = f"- `{timestamp}` {icon} **{level}**: {message}"
-                
-                # 在標記後插入新行 (最新的在最上面)
-                new_content = content_str.replace(insert_marker, f"{insert_marker}\n{log_entry}")
-                
-                if new_content != content_str:
-                    commit_msg = f"📝 Log: {project_name} - {message[:30]}..."
-                    self.repo.update_file(contents.path, commit_msg, new_content, contents.sha)
-                    print(f"📄 Log appended to {status_file_path}")
-                else:
-                    print("Log content identitical, skipping.")
-            else:
-                print(f"❌ Marker {insert_marker} not found in {status_file_path}. Please initialize the status file properly.")
-                
-        except Exception as e:
-            print(f"❌ Failed to write log for {project_name}: {e}. (Does the file exist?)")
+        self._submit({
+            "op": "log",
+            "project": project_name,
+            "message": message,
+            "level": level,
+            "time": self._get_time_str(),
+        })
 
     def update_status(self, project_name, status, link=None, type_icon="☁️"):
         """
         更新 Dashboard 總表 (只更新狀態欄位)
+        type_icon=None 時保留 Dashboard 上原本的類型圖示
         """
-        file_path = "DASHBOARD.md"
-        try:
-            contents = self.repo.get_contents(file_path)
-            content_str = contents.decoded_content.decode("utf-8")
-            
-            lines = content_str.split('\n')
-            new_lines = []
-            found = False
-            
-            for line in lines:
-                if f"**{project_name}**" in line:
-                    parts = [p.strip() for p in line.split('|')]
-                    if len(parts) >= 5:
-                        final_link = link if link else parts[3]
-                        # Update row
-                        new_line = f"| {type_icon} | **{project_name}** | {final_link} | {status} |"
-                        new_lines.append(new_line)
-                        found = True
-                    else:
-                        new_lines.append(line)
-                else:
-                    new_lines.append(line)
-            
-            if found:
-                new_content = '\n'.join(new_lines)
-                if new_content != content_str:
-                    self.repo.update_file(contents.path, f"🤖 Status Update: {project_name}", new_content, contents.sha)
-                    print(f"✅ Dashboard updated: {project_name} -> {status}")
-            else:
-                print(f"⚠️ Project {project_name} not found in Dashboard. Use register() first.")
-                
-        except Exception as e:
-            print(f"❌ Failed to update dashboard: {e}")
+        self._submit({
+            "op": "status",
+            "project": project_name,
+            "status": status,
+            "link": link,
+            "type_icon": type_icon,
+            "time": self._get_time_str(),
+        })
 
     def register(self, project_name, project_type="🖥️", link="(Local)", initial_status="🆕 Registered"):
         """
@@ -149,51 +399,656 @@ class ProjectReporter:
         1. 在 Dashboard 新增一列
         2. 建立 projects/{project_name}/STATUS.md
         """
-        # Step 1: Add to Dashboard
-        file_path = "DASHBOARD.md"
+        self._submit({
+            "op": "register",
+            "project": project_name,
+            "type_icon": project_type,
+            "link": link,
+            "status": initial_status,
+            "time": self._get_time_str(),
+        })
+
+    @contextmanager
+    def batch(self, message=None):
+        """
+        批次模式：區塊內的 register()/log()/update_status() 只暫存在記憶體，
+        離開區塊時以 Git Data API 一次發佈 (1 tree + 1 commit + 1 ref 更新)。
+
+            with reporter.batch() as result:
+                reporter.register("Demo")
+                reporter.log("Demo", "Kickoff")
+                reporter.update_status("Demo", "🚧 Working")
+            result["status"]    # published / spooled (送出失敗或 offline) / queued (背景模式) / empty
+            result["skipped"]   # 被略過的回報所屬的專案 (例如不在 Dashboard)，只在 published 時有值
+
+        巢狀呼叫會併入最外層的 batch (取得同一個 result)。區塊內發生例外時，暫存內容會被丟棄。
+        """
+        if self._batch is not None:
+            yield self._batch_result
+            return
+
+        self._batch = []
+        self._batch_result = result = {"status": "empty", "skipped": []}
         try:
-            contents = self.repo.get_contents(file_path)
-            content_str = contents.decoded_content.decode("utf-8")
-            
-            # Check if already exists
-            if f"**{project_name}**" in content_str:
-                print(f"ℹ️ Project {project_name} already exists in Dashboard.")
+            yield result
+        except BaseException:
+            self._batch = None
+            raise
+
+        ops, self._batch = self._batch, None
+        if ops and self.offline:
+            self._spool(ops)
+            result["status"] = "spooled"
+        elif ops and self._queue is not None:
+            for op in ops:
+                self._queue.put(op)
+            result["status"] = "queued"
+        elif ops:
+            try:
+                skipped = self._publish(ops, message) or []
+                result.update(status="published", skipped=list(dict.fromkeys(op["project"] for op in skipped)))
+            except Exception as e:
+                print(f"❌ Failed to publish batch ({len(ops)} updates): {e}")
+                self._spool(ops)
+                result["status"] = "spooled"
+
+    def report_many(self, reports, message=None):
+        """
+        一次送出多個專案的回報 (一個 commit；DASHBOARD.md 只重寫一次)：
+            reporter.report_many([
+                {"op": "register", "project_name": "A", "project_type": "🎨"},
+                {"op": "log", "project_name": "A", "message": "Kickoff"},
+                {"op": "status", "project_name": "B", "status": "✅ Done"},
+            ])
+        op: register / log / status，其餘欄位為 register()/log()/update_status() 的參數
+        ("project" 可代替 "project_name")。全部檢查通過才會送出，任何一筆有誤時丟出 ValueError。
+        回傳 batch() 的結果加上筆數：{"status", "skipped", "count"}；
+        送出失敗時 status 為 "spooled" (回報已寫入 spool，稍後 replay())。
+        """
+        calls = {"register": self.register, "log": self.log, "status": self.update_status}
+        prepared = []
+        for n, report in enumerate(reports, 1):
+            kwargs = dict(report)
+            kind = kwargs.pop("op", None)
+            if kind not in calls:
+                raise ValueError(f"Report #{n}: unknown op {kind!r} (expected register / log / status)")
+            if "project" in kwargs:
+                kwargs["project_name"] = kwargs.pop("project")
+            try:
+                inspect.signature(calls[kind]).bind(**kwargs)
+            except TypeError as e:
+                raise ValueError(f"Report #{n} ({kind}): {e}") from None
+            prepared.append((calls[kind], kwargs))
+        if not prepared:
+            return {"status": "empty", "skipped": [], "count": 0}
+
+        projects = {kwargs["project_name"] for _fn, kwargs in prepared}
+        with self.batch(message or f"📦 Bulk report: {len(prepared)} updates, {len(projects)} project(s)") as result:
+            for fn, kwargs in prepared:
+                fn(**kwargs)
+        return dict(result, count=len(prepared))
+
+    def flush(self):
+        """
+        等待背景佇列中的所有回報送出。非背景模式下不做任何事。
+        背景模式會在直譯器結束時自動呼叫。
+        """
+        if self._queue is not None:
+            self._queue.join()
+
+    def replay(self):
+        """
+        重送 spool 中累積的回報：依原順序、每個專案合併成一個 commit。
+        成功的項目會從 spool 移除，失敗的保留到下次。
+        每筆回報都帶有 id，log 行會記錄該 id，所以重送不會產生重複的日誌。
+        回傳成功送出的筆數。
+        """
+        with self._spool_lock:
+            pending = self._read_spool()
+        if not pending:
+            print("ℹ️ Spool is empty, nothing to replay.")
+            return 0
+        with operation("reporter.replay", updates=len(pending)):
+            return self._replay(pending)
+
+    def _replay(self, pending):
+        """replay() 的主體：依專案重送 pending，並改寫 spool"""
+        by_project = {}
+        for op in pending:
+            by_project.setdefault(op["project"], []).append(op)
+
+        failed = []
+        for project_name, ops in by_project.items():
+            try:
+                self._publish(_coalesce(ops), f"🔁 Replay: {project_name} ({len(ops)} updates)")
+            except Exception as e:
+                print(f"❌ Failed to replay {len(ops)} updates for {project_name}: {e}")
+                failed.extend(ops)
+
+        # replay 期間可能有新的回報被 spool，保留它們
+        with self._spool_lock:
+            current = self._read_spool()
+            replayed_ids = {op["id"] for op in pending}
+            remaining = failed + [op for op in current if op["id"] not in replayed_ids]
+            self._write_spool(remaining)
+
+        sent = len(pending) - len(failed)
+        print(f"🔁 Replayed {sent}/{len(pending)} spooled updates")
+        return sent
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def snapshot(self, log_entries=3, projects=None):
+        """
+        讀取整個 Command Center 的狀態，請求數與專案數量無關：
+        1 次 tree 列表 (recursive) + 平行讀取 DASHBOARD.md 與各 STATUS.md 的 blob
+        (blob SHA 沒變的檔案直接使用 _CACHE，同一個 process 內重複呼叫時通常只需要 tree 列表這一個請求)。
+        log_entries: 每個專案回傳最新幾筆日誌
+        projects: 只讀取這些專案 (預設全部)
+        回傳：
+            {"tree": sha, "projects": {name: {
+                "type", "link", "status", "updated",        # Dashboard 欄位 (未在 Dashboard 中時為 None)
+                "last_status", "last_updated",              # STATUS.md Summary
+                "logs": [{"time", "level", "message"}],    # 最新在前
+                "blockers": [str],
+                "has_status_file": bool}}}
+        """
+        with operation("reporter.snapshot"):
+            if self.backend is not None:
+                tree_sha = self.backend.head()
+                blob_shas = self.backend.files(tree_sha)
+                read_file = lambda path: self.backend.read(path, tree_sha)
             else:
-                # Find table end (line before ## Scratchpad or similar)
-                lines = content_str.split('\n')
-                insert_idx = None
-                for i, line in enumerate(lines):
-                    if line.startswith("## ") and "Scratchpad" in line:
-                        insert_idx = i
-                        break
-                
-                if insert_idx:
-                    new_row = f"| {project_type} | **{project_name}** | {link} | {initial_status} |"
-                    lines.insert(insert_idx, new_row)
-                    new_content = '\n'.join(lines)
-                    self.repo.update_file(contents.path, f"🆕 Register: {project_name}", new_content, contents.sha)
-                    print(f"✅ Added {project_name} to Dashboard")
+                tree = self.repo.get_git_tree(self.default_branch, recursive=True)
+                tree_sha = tree.sha
+                blob_shas = {el.path: el.sha for el in tree.tree if el.type == "blob"}
+                read_file = lambda path: self._read_blob(path, blob_shas.get(path))
+
+            status_paths = {}
+            for path in blob_shas:
+                m = _STATUS_PATH_RE.match(path)
+                if m and (projects is None or m.group(1) in projects):
+                    status_paths[m.group(1)] = path
+            wanted = list(status_paths.values())
+            wanted.append(DASHBOARD_PATH)
+
+            def read(path):
+                return path, read_file(path)
+
+            with ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS) as pool:
+                contents = dict(pool.map(metrics_wrap(read), wanted))
+
+            dashboard = self._load_dashboard(_Changeset(lambda path: contents.get(path))) or {}
+            result = {}
+            for name in sorted(set(dashboard) | set(status_paths)):
+                if projects is not None and name not in projects:
+                    continue
+                row = dashboard.get(name, {})
+                entry = {
+                    "type": row.get("type"),
+                    "link": row.get("link"),
+                    "status": row.get("status"),
+                    "updated": row.get("updated"),
+                    "has_status_file": name in status_paths,
+                }
+                status_file = contents.get(status_paths.get(name))
+                entry.update(_parse_status_file(status_file[0] if status_file else "", log_entries))
+                result[name] = entry
+            return {"tree": tree_sha, "projects": result}
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    def _submit(self, op):
+        """直接寫入 (每個檔案一個 commit)，或在 batch() 中暫存，或交給背景 worker"""
+        op["id"] = uuid.uuid4().hex
+        if self._batch is not None:
+            mode = "batch"
+        elif self.offline:
+            mode = "offline"
+        elif self._queue is not None:
+            mode = "background"
+        else:
+            mode = "direct"
+
+        with operation(f"reporter.{op['op']}", project=op["project"], mode=mode):
+            if mode == "batch":
+                self._batch.append(op)
+            elif mode == "offline":
+                self._spool([op])
+            elif mode == "background":
+                self._queue.put(op)
+            else:
+                try:
+                    self._retry_on_conflict(lambda refresh: self._write_direct(op, refresh), _describe(op))
+                except Exception as e:
+                    print(f"❌ Failed to {_describe(op)}: {e}")
+                    self._spool([op])
+
+    def _retry_on_conflict(self, attempt, what):
+        """
+        樂觀並行控制：attempt(refresh) 遇到 409/422 (別的 agent 先寫入) 時，
+        以 full-jitter 指數退避後重新讀取最新內容、重新套用操作。
+        操作本身是語意層級的 (「設定某列狀態」「在 LOG_START 後插入一行」)，
+        且 log 帶有 id，因此重新套用是安全的。
+        """
+        if self.backend is not None:
+            # backend 在自己的寫入鎖內讀取並提交，不會有 409/422
+            return attempt(False)
+        for n in range(MAX_CONFLICT_RETRIES + 1):
+            try:
+                return attempt(n > 0)
+            except _github().GithubException as e:
+                if e.status not in (409, 422) or n == MAX_CONFLICT_RETRIES:
+                    raise
+                count_metric("conflict_retries")
+                delay = random.uniform(0, CONFLICT_BACKOFF * (2 ** n))
+                print(f"🔄 Conflict while trying to {what} ({e.status}), retry {n + 1}/{MAX_CONFLICT_RETRIES} in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _acquire(self, cost):
+        """送出約 cost 個請求前先確認 rate limit 預算 (quota 不足時等待或丟出例外)"""
+        if self._budget is not None:
+            self._budget.acquire(cost)
+
+    def _write_direct(self, op, refresh=False):
+        """
+        寫入單一操作。只改到一個檔案時用 Contents API；改到多個檔案
+        (例如第一次註冊時的 DASHBOARD.md + STATUS.md) 時以 Git Data API 落在同一個 commit。
+        refresh=True 時先丟棄快取。
+        """
+        if self.backend is not None:
+            return self._write_backend([op])
+        self._acquire(4)
+        changes = _Changeset(self._refetch_contents if refresh else self._read_contents)
+        self._apply(op, changes)
+        changed = changes.changed()
+
+        if len(changed) > 1:
+            ref, head = self._get_head()
+            blob_shas = self._get_blob_shas(head)
+            stale = [path for path, (_c, sha, _m) in changed.items() if blob_shas.get(path) != sha]
+            if stale:
+                # 與 Contents API 的 SHA 衝突相同處理：交由 _retry_on_conflict 重新讀取
+                raise _github().GithubException(409, {"message": f"Stale copy of {', '.join(stale)}"}, None)
+            self._commit_tree(ref, head, changed)
+        else:
+            for path, (content, sha, commit_msg) in changed.items():
+                if sha is None:
+                    result = self.repo.create_file(path, commit_msg, content)
                 else:
-                    print("❌ Could not find insertion point in Dashboard")
-                    
+                    result = self.repo.update_file(path, commit_msg, content, sha)
+                _CACHE.put(self._cache_scope, path, content, result["content"].sha)
+        changes.print_notes()
+
+    def _worker(self):
+        """背景 worker：把同一波的回報收集起來，合併成一個 commit 送出"""
+        while True:
+            ops = [self._queue.get()]
+            deadline = time.monotonic() + COALESCE_WINDOW
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    ops.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._publish(_coalesce(ops))
+            except Exception as e:
+                print(f"❌ Failed to publish {len(ops)} background updates: {e}")
+                self._spool(ops)
+            finally:
+                for _ in ops:
+                    self._queue.task_done()
+
+    def _publish(self, ops, message=None):
+        """
+        以 Git Data API 將多筆操作合併成一個 commit；branch 被別人推進時重新套用。
+        回傳被略過的操作 (例如專案不在 Dashboard)。
+        """
+        with operation("reporter.publish", updates=len(ops)):
+            return self._retry_on_conflict(lambda _refresh: self._publish_once(ops, message), f"publish {len(ops)} updates")
+
+    def _publish_once(self, ops, message=None):
+        if self.backend is not None:
+            return self._write_backend(ops, message)
+        self._acquire(6)
+        ref, head = self._get_head()
+        blob_shas = self._get_blob_shas(head)
+
+        changes = _Changeset(lambda path: self._read_blob(path, blob_shas.get(path)))
+        skipped = [op for op in ops if self._apply(op, changes) is False]
+
+        changed = changes.changed()
+        if not changed:
+            print("ℹ️ Batch produced no changes, skipping commit.")
+            return skipped
+
+        commit = self._commit_tree(ref, head, changed, message or f"📦 Batch: {len(ops)} updates")
+        changes.print_notes()
+        print(f"📦 Published {len(changed)} file(s) in one commit ({commit.sha[:7]})")
+        return skipped
+
+    def _write_backend(self, ops, message=None):
+        """把 ops 套用到 backend 的最新內容，提交為一個 commit；回傳被略過的操作"""
+        applied, skipped = [], []
+
+        def build(read):
+            changes = _Changeset(read)
+            skipped[:] = [op for op in ops if self._apply(op, changes) is False]
+            changed = changes.changed()
+            applied[:] = [changes]
+            if not changed:
+                return None
+            return {path: content for path, (content, _sha, _msg) in changed.items()}, _commit_message(changed, message)
+
+        commit = self.backend.update(build, ops, message)
+        if commit is None:
+            print("ℹ️ No changes, skipping commit.")
+            return skipped
+        applied[0].print_notes()
+        print(f"💾 Committed {len(ops)} update(s) to local mirror ({commit[:7]})")
+        return skipped
+
+    def _get_head(self):
+        """回傳 (branch ref, head commit)"""
+        ref = self.repo.get_git_ref(f"heads/{self.default_branch}")
+        return ref, self.repo.get_git_commit(ref.object.sha)
+
+    def _get_blob_shas(self, head):
+        """一次列出 head 的整棵 tree，回傳 {path: blob sha}"""
+        tree = self.repo.get_git_tree(head.tree.sha, recursive=True)
+        return {el.path: el.sha for el in tree.tree if el.type == "blob"}
+
+    def _commit_tree(self, ref, head, changed, message=None):
+        """把 changed 的所有檔案做成一個以 head 為 parent 的 commit，並推進 ref"""
+        # content 直接內嵌在 tree 中，GitHub 會自動建立 blob，省去每個檔案一次 POST
+        elements = [
+            _github().InputGitTreeElement(path, "100644", "blob", content=content)
+            for path, (content, _sha, _msg) in changed.items()
+        ]
+        new_tree = self.repo.create_git_tree(elements, base_tree=head.tree)
+        commit = self.repo.create_git_commit(_commit_message(changed, message), new_tree, [head])
+        # force=False：若 branch 已被其他 agent 推進，GitHub 回傳 422，交由重試重新套用
+        ref.edit(commit.sha, force=False)
+
+        for path, (content, _sha, _msg) in changed.items():
+            _CACHE.put(self._cache_scope, path, content, _git_blob_sha(content))
+        return commit
+
+    def _spool(self, ops):
+        """把回報 append 到本地 spool (JSONL)，等待 replay()"""
+        count_metric("spooled", len(ops))
+        try:
+            with self._spool_lock:
+                spool_dir = os.path.dirname(self.spool_path)
+                if spool_dir:
+                    os.makedirs(spool_dir, exist_ok=True)
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for op in ops:
+                        f.write(json.dumps(op, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            print(f"💾 Spooled {len(ops)} update(s) to {self.spool_path}. Run replay() to sync later.")
         except Exception as e:
-            print(f"❌ Failed to register in Dashboard: {e}")
+            print(f"❌ Failed to spool {len(ops)} update(s), they are lost: {e}")
+
+    def _read_spool(self):
+        """讀取 spool，依 id 去除重複 (保留第一次出現的順序)"""
+        if not os.path.exists(self.spool_path):
+            return []
+        ops, seen = [], set()
+        with open(self.spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # 寫入中途被中斷的最後一行
+                    continue
+                if op["id"] not in seen:
+                    seen.add(op["id"])
+                    ops.append(op)
+        return ops
+
+    def _write_spool(self, ops):
+        """以暫存檔 + os.replace 原子性地改寫 spool"""
+        if not ops:
+            if os.path.exists(self.spool_path):
+                os.remove(self.spool_path)
             return
-        
+        tmp_path = f"{self.spool_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for op in ops:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.spool_path)
+
+    def _read_contents(self, path):
+        """經由 Contents API (含快取) 讀取檔案，回傳 (content, sha)；不存在時回傳 None"""
+        return _fetch_file(self.repo, path, self._cache_scope)
+
+    def _refetch_contents(self, path):
+        """丟棄快取後重新讀取 (用於 SHA 過期時)"""
+        _CACHE.invalidate(self._cache_scope, path)
+        return _fetch_file(self.repo, path, self._cache_scope)
+
+    def _read_blob(self, path, sha):
+        """讀取 tree 中的 blob；快取中的 SHA 相同時不需任何請求"""
+        if sha is None:
+            return None
+        cached = _CACHE.get(self._cache_scope, path)
+        if cached and cached[1] == sha:
+            return cached[0], sha
+        blob = self.repo.get_git_blob(sha)
+        content = base64.b64decode(blob.content).decode("utf-8")
+        _CACHE.put(self._cache_scope, path, content, sha)
+        return content, sha
+
+    # ------------------------------------------------------------------
+    # Operations (純文字轉換，可在直接模式與 batch 模式共用)
+    # ------------------------------------------------------------------
+
+    def _apply(self, op, changes):
+        """套用一筆操作；回傳 False 表示被略過 (例如專案不在 Dashboard、STATUS.md 不存在)"""
+        kind = op["op"]
+        if kind == "log":
+            return self._apply_log(op, changes)
+        elif kind == "status":
+            return self._apply_status(op, changes)
+        elif kind == "register":
+            return self._apply_register(op, changes)
+        else:
+            raise ValueError(f"Unknown report operation: {kind}")
+
+    def _apply_log(self, op, changes):
+        project_name, message, level = op["project"], op["message"], op["level"]
+        status_file_path = f"projects/{project_name}/STATUS.md"
+
+        content_str = changes.read(status_file_path)
+        if content_str is None:
+            print(f"❌ {status_file_path} not found. (Does the file exist? Use register() first.)")
+            return False
+
+        # 使用標記 <!-- LOG_START --> 來定位插入點
+        if LOG_START not in content_str:
+            print(f"❌ Marker {LOG_START} not found in {status_file_path}. Please initialize the status file properly.")
+            return False
+
+        # 冪等：這筆回報若已寫入過 (例如重送)，就不再插入
+        op_marker = f"<!-- op:{op['id']} -->"
+        if op_marker in content_str:
+            print(f"ℹ️ Log {op['id'][:8]} already in {status_file_path}, skipping.")
+            return True
+
+        icon = "ℹ️" if level=="INFO" else "⚠️" if level=="WARN" else "✅"
+        log_entry = f"- `{op['time']}` {icon} **{level}**: {message} {op_marker}"
+
+        # 在標記後插入新行 (最新的在最上面)
+        new_content = content_str.replace(LOG_START, f"{LOG_START}\n{log_entry}")
+        # 先寫封存檔、最後才寫 STATUS.md：逐檔寫入時中途失敗也不會遺失日誌
+        new_content = self._rotate_log(project_name, new_content, changes)
+        changes.write(status_file_path, new_content, f"📝 Log: {project_name} - {message[:30]}...")
+        changes.note(f"📄 Log appended to {status_file_path}")
+        return True
+
+    def _load_dashboard(self, changes):
+        """
+        讀取 DASHBOARD.md 內嵌的專案索引，回傳 {project_name: row}；DASHBOARD.md 不存在時回傳 None。
+        還沒有內嵌索引時，從既有的表格建立索引。
+        同一個 changeset 內回傳同一個 dict，多筆操作的修改會累積在一起。
+        """
+        if DASHBOARD_PATH in changes.parsed:
+            return changes.parsed[DASHBOARD_PATH]
+        content_str = changes.read(DASHBOARD_PATH)
+        if content_str is None:
+            return None
+
+        projects = _parse_dashboard_index(content_str)
+        if projects is None:
+            projects = {}
+            for line in content_str.split('\n'):
+                m = _ROW_RE.match(line)
+                if m:
+                    type_icon, name, link, status = m.groups()
+                    projects[name] = {"type": type_icon, "link": link, "status": status, "updated": None}
+        changes.parsed[DASHBOARD_PATH] = projects
+        return projects
+
+    def _save_dashboard(self, changes, projects, message):
+        """
+        重新產生 DASHBOARD.md 中的專案表格與索引。
+        實際的產生延到 changes.changed() 時才做一次，batch 中的多筆狀態更新不會重複重寫。
+        """
+        changes.defer(DASHBOARD_PATH, lambda: changes.write(
+            DASHBOARD_PATH, _render_dashboard(changes.read(DASHBOARD_PATH), projects), message))
+
+    def _rotate_log(self, project_name, content_str, changes):
+        """
+        STATUS.md 日誌超過 max_log_entries * LOG_ROTATE_FACTOR 筆時，把超過 max_log_entries
+        的舊日誌依月份移到 projects/{name}/log/YYYY-MM.md，並更新 projects/{name}/log/INDEX.md。
+        回傳保留最新日誌的 STATUS.md 內容。
+        """
+        if not self.max_log_entries:
+            return content_str
+        start = content_str.find(LOG_START)
+        end = content_str.find(LOG_END, start)
+        if end < 0:
+            return content_str
+
+        body = content_str[start + len(LOG_START):end].strip("\n").split("\n")
+        if sum(line.startswith("- `") for line in body) <= self.max_log_entries * LOG_ROTATE_FACTOR:
+            return content_str
+        kept, overflow, count = [], [], 0
+        for line in body:
+            if line.startswith("- `"):
+                count += 1
+                if count > self.max_log_entries:
+                    overflow.append(line)
+                    continue
+            kept.append(line)
+        if not overflow:
+            return content_str
+
+        by_month = {}
+        for line in overflow:
+            m = re.match(r"- `(\d{4}-\d{2})", line)
+            month = m.group(1) if m else datetime.now(self.tz).strftime("%Y-%m")
+            by_month.setdefault(month, []).append(line)
+
+        index_path = f"projects/{project_name}/log/INDEX.md"
+        index_counts = _parse_log_index(changes.read(index_path))
+        for month, lines in by_month.items():
+            shard_path = f"projects/{project_name}/log/{month}.md"
+            shard = changes.read(shard_path)
+            if shard is None:
+                shard = f"# Activity Log Archive: {project_name} ({month})\n\n{LOG_START}\n{LOG_END}\n"
+            # 重試時這些行可能已經封存過，略過以保持冪等 (比對整行，不是子字串)
+            archived = set(shard.split("\n"))
+            new_lines = [line for line in lines if line not in archived]
+            if new_lines:
+                shard = shard.replace(LOG_START, LOG_START + "\n" + "\n".join(new_lines), 1)
+                changes.write(shard_path, shard, f"🗄️ Archive log: {project_name} ({month})")
+            index_counts[month] = shard.count("\n- `")
+
+        index = [f"# Activity Log Archive: {project_name}", "", "| Month | Entries |", "| :--- | :--- |"]
+        for month in sorted(index_counts, reverse=True):
+            index.append(f"| [{month}]({month}.md) | {index_counts[month]} |")
+        changes.write(index_path, "\n".join(index) + "\n", f"🗄️ Archive index: {project_name}")
+        changes.note(f"🗄️ Archived {len(overflow)} old log entries of {project_name}")
+
+        return content_str[:start] + LOG_START + "\n" + "\n".join(kept) + "\n" + content_str[end:]
+
+    def _apply_status(self, op, changes):
+        project_name, status = op["project"], op["status"]
+
+        projects = self._load_dashboard(changes)
+        if projects is None:
+            print(f"❌ {DASHBOARD_PATH} not found in {self.repo_name}.")
+            return False
+
+        row = projects.get(project_name)
+        if row is None:
+            print(f"⚠️ Project {project_name} not found in Dashboard. Use register() first.")
+            return False
+
+        row.update({
+            "type": op["type_icon"] or row["type"],
+            "link": op["link"] if op["link"] else row["link"],
+            "status": status,
+            "updated": op["time"],
+        })
+        self._save_dashboard(changes, projects, f"🤖 Status Update: {project_name}")
+        changes.note(f"✅ Dashboard updated: {project_name} -> {status}")
+        return True
+
+    def _apply_register(self, op, changes):
+        project_name, initial_status = op["project"], op["status"]
+
+        # Step 1: Add to Dashboard
+        projects = self._load_dashboard(changes)
+        if projects is None:
+            print(f"❌ Failed to register in Dashboard: {DASHBOARD_PATH} not found.")
+            return False
+
+        # Check if already exists
+        if project_name in projects:
+            print(f"ℹ️ Project {project_name} already exists in Dashboard.")
+        else:
+            projects[project_name] = {
+                "type": op["type_icon"],
+                "link": op["link"],
+                "status": initial_status,
+                "updated": op["time"],
+            }
+            self._save_dashboard(changes, projects, f"🆕 Register: {project_name}")
+            changes.note(f"✅ Added {project_name} to Dashboard")
+
         # Step 2: Create STATUS.md
         status_file_path = f"projects/{project_name}/STATUS.md"
+        if changes.read(status_file_path) is not None:
+            print(f"ℹ️ STATUS.md already exists for {project_name}")
+            return True
+
         status_template = f"""# Project Status: {project_name}
 
 ## 📍 Summary
 | Metric | Value |
 | :--- | :--- |
 | **Last Status** | {initial_status} |
-| **Last Updated** | {self._get_time_str()} |
+| **Last Updated** | {op['time']} |
 
 ## 📝 Activity Log (Latest on Top)
-<!-- LOG_START -->
-- `{self._get_time_str()}` ✅ **INFO**: Project registered in AI Command Center
-<!-- LOG_END -->
+{LOG_START}
+- `{op['time']}` ✅ **INFO**: Project registered in AI Command Center
+{LOG_END}
 
 ## 📅 Todo List
 - [ ] Define objectives
@@ -203,14 +1058,220 @@ class ProjectReporter:
 ## 🛑 Blockers & Issues
 - None yet.
 """
+        changes.write(status_file_path, status_template, f"🆕 Create STATUS for {project_name}")
+        changes.note(f"✅ Created {status_file_path}")
+        return True
+
+
+class _Changeset:
+    """
+    記憶體中的檔案暫存區：第一次 read() 時向 reader 取得 (content, sha)，
+    之後的 read()/write() 都在本地副本上進行。
+    """
+    def __init__(self, reader):
+        self._reader = reader
+        self._base = {}      # path -> (content, sha) 或 None (檔案不存在)
+        self._files = {}     # path -> 目前內容
+        self._messages = {}  # path -> commit message
+        self._order = []     # 寫入順序 (最後寫入的排最後)
+        self._notes = []
+        self._deferred = {}  # key -> 延後到 changed() 才執行的寫入 (同一個 key 只保留最後一次)
+        self.parsed = {}     # 解析後的檔案 (例如 Dashboard 索引)，供同一個 changeset 的操作共用
+
+    def read(self, path):
+        if path not in self._base:
+            self._base[path] = self._reader(path)
+            self._files[path] = self._base[path][0] if self._base[path] else None
+        return self._files[path]
+
+    def write(self, path, content, message):
+        self.read(path)
+        self._files[path] = content
+        self._messages[path] = message
+        if path in self._order:
+            self._order.remove(path)
+        self._order.append(path)
+
+    def defer(self, key, write):
+        """write() 延到 changed() 才執行；寫入的檔案排在最後一次 defer() 的位置"""
+        slot = ("deferred", key)
+        if slot in self._order:
+            self._order.remove(slot)
+        self._order.append(slot)
+        self._deferred[key] = write
+
+    def note(self, text):
+        self._notes.append(text)
+
+    def print_notes(self):
+        for text in self._notes:
+            print(text)
+
+    def changed(self):
+        """回傳 {path: (content, base_sha, commit_msg)}，只包含實際有變動的檔案，依寫入順序排列"""
+        for key in list(self._deferred):
+            slot = self._order.index(("deferred", key))
+            tail = self._order[slot + 1:]
+            del self._order[slot:]
+            self._deferred.pop(key)()
+            self._order.extend(path for path in tail if path not in self._order)
+        result = {}
+        for path in self._order:
+            content, base = self._files[path], self._base[path]
+            if content is None or (base is not None and base[0] == content):
+                continue
+            result[path] = (content, base[1] if base else None, self._messages[path])
+        return result
+
+
+def _render_dashboard(content_str, projects):
+    """
+    以 projects 重新產生 DASHBOARD.md 的專案表格與索引 (PROJECTS_START/END 標記之間)，
+    表格以外的內容保持不變。舊格式 (沒有標記) 的 Dashboard 會在此轉換。
+    """
+    table = [PROJECTS_START, "| Type | Project Name | Link | Status |", "| :---: | :--- | :--- | :--- |"]
+    for name, row in projects.items():
+        table.append(f"| {row['type']} | **{name}** | {row['link']} | {row['status']} |")
+    table += [""] + render_index(projects) + [PROJECTS_END]
+
+    lines = content_str.split('\n')
+    if PROJECTS_START in lines and PROJECTS_END in lines:
+        start, end = lines.index(PROJECTS_START), lines.index(PROJECTS_END)
+        return '\n'.join(lines[:start] + table + lines[end + 1:])
+
+    # 舊格式：取代含有專案列的表格；沒有專案列時取代 Scratchpad 之前的第一個表格
+    tables = []
+    i = 0
+    while i + 1 < len(lines):
+        if lines[i].startswith("|") and _TABLE_SEP_RE.match(lines[i + 1]):
+            end = i + 1
+            while end + 1 < len(lines) and lines[end + 1].startswith("|"):
+                end += 1
+            tables.append((i, end))
+            i = end + 1
+        else:
+            i += 1
+
+    scratchpad_idx = next((i for i, line in enumerate(lines) if line.startswith("## ") and "Scratchpad" in line), len(lines))
+    target = next((t for t in tables if any(_ROW_RE.match(line) for line in lines[t[0]:t[1] + 1])), None)
+    if target is None:
+        target = next((t for t in tables if t[0] < scratchpad_idx), None)
+    if target is None:
+        return '\n'.join(lines[:scratchpad_idx] + table + [""] + lines[scratchpad_idx:])
+    return '\n'.join(lines[:target[0]] + table + lines[target[1] + 1:])
+
+
+def _commit_message(changed, message=None):
+    """commit 訊息：標題 (預設為第一個檔案的訊息) + 各檔案訊息的列表"""
+    messages = list(dict.fromkeys(msg for _c, _s, msg in changed.values()))
+    body = "\n".join(f"- {msg}" for msg in messages)
+    return f"{message or messages[0]}\n\n{body}"
+
+
+def _parse_status_file(content, log_entries):
+    """從 STATUS.md 取出 Summary、最新 log_entries 筆日誌與 Blockers"""
+    summary = dict(_SUMMARY_RE.findall(content))
+    logs = []
+    if LOG_START in content:
+        block = content.split(LOG_START, 1)[1].split(LOG_END, 1)[0]
+        for line in block.split("\n"):
+            if len(logs) >= log_entries:
+                break
+            m = _LOG_LINE_RE.match(line.strip())
+            if m:
+                logs.append({"time": m.group(1), "level": m.group(3), "message": m.group(4)})
+
+    blockers = []
+    in_blockers = False
+    for line in content.split("\n"):
+        if line.startswith("## "):
+            in_blockers = "Blockers" in line
+        elif in_blockers and line.startswith("- ") and line[2:].strip() not in ("None yet.", "None"):
+            blockers.append(line[2:].strip())
+
+    return {
+        "last_status": summary.get("Last Status"),
+        "last_updated": summary.get("Last Updated"),
+        "logs": logs,
+        "blockers": blockers,
+    }
+
+
+def _parse_log_index(content):
+    """解析 log/INDEX.md，回傳 {month: entries}"""
+    counts = {}
+    for m in re.finditer(r"^\| \[(\d{4}-\d{2})\]\(.*?\) \| (\d+) \|", content or "", re.M):
+        counts[m.group(1)] = int(m.group(2))
+    return counts
+
+
+def _coalesce(ops):
+    """
+    合併一波回報：同一專案的 Dashboard 狀態只保留最後一筆。
+    log 不可合併 (每一行都要保留)，但同一個 STATUS.md 的多行會落在同一個 commit。
+    """
+    last_status = {}
+    for i, op in enumerate(ops):
+        if op["op"] == "status":
+            last_status[op["project"]] = i
+    return [
+        op for i, op in enumerate(ops)
+        if op["op"] != "status" or last_status[op["project"]] == i
+    ]
+
+
+def _describe(op):
+    kind, project = op["op"], op["project"]
+    if kind == "log":
+        return f"write log for {project}"
+    if kind == "status":
+        return f"update dashboard for {project}"
+    return f"register {project}"
+
+
+def _read_reports(stream):
+    """讀取 JSONL (每行一筆 report_many() 的回報)，空行與 # 開頭的行略過"""
+    reports = []
+    for n, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
         try:
-            # Check if file exists
-            self.repo.get_contents(status_file_path)
-            print(f"ℹ️ STATUS.md already exists for {project_name}")
-        except:
-            # File doesn't exist, create it
-            try:
-                self.repo.create_file(status_file_path, f"🆕 Create STATUS for {project_name}", status_template)
-                print(f"✅ Created {status_file_path}")
-            except Exception as e:
-                print(f"❌ Failed to create STATUS.md: {e}")
+            reports.append(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f"Line {n}: invalid JSON ({e})") from None
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Command Center Reporter")
+    sub = parser.add_subparsers(dest="command")
+    many_parser = sub.add_parser("report-many", help="從 stdin 讀取 JSONL 回報，以一個 commit 送出")
+    many_parser.add_argument("--repo", help="Command Center repo (預設取 PRIVATE_DATA_REPO)")
+    many_parser.add_argument("--message", help="commit 訊息")
+    many_parser.add_argument("--file", help="從檔案讀取 (預設 stdin)")
+    args = parser.parse_args()
+
+    if args.command == "report-many":
+        try:
+            if args.file:
+                with open(args.file, "r", encoding="utf-8") as f:
+                    reports = _read_reports(f)
+            else:
+                reports = _read_reports(sys.stdin)
+            if args.repo:
+                # 建構子以 PRIVATE_DATA_REPO 優先，明確指定的 --repo 要蓋過它
+                os.environ["PRIVATE_DATA_REPO"] = args.repo
+            reporter = ProjectReporter(os.environ.get("GITHUB_TOKEN"), lazy=True)
+            result = reporter.report_many(reports, args.message)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        if result["status"] == "spooled":
+            print(f"❌ Could not send {result['count']} updates (spooled to {reporter.spool_path}, run replay() later)")
+            sys.exit(1)
+        if result["skipped"]:
+            print(f"⚠️ Skipped updates for: {', '.join(result['skipped'])}")
+        print(f"✅ Sent {result['count']} updates")
+    else:
+        parser.print_help()
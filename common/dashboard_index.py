@@ -0,0 +1,25 @@
+"""
+Dashboard Index
+DASHBOARD.md 內嵌的專案索引 (PROJECTS_START/END 之間的 HTML 註解，每個專案一行 JSON)。
+由 command_center_reporter 產生，workspace_manager 讀取；兩者共用同一個解析器。
+"""
+
+import re
+import json
+
+PROJECTS_INDEX = "<!-- PROJECTS_INDEX"
+
+_INDEX_RE = re.compile(r"^<!-- PROJECTS_INDEX\n(.*?)\n-->$", re.S | re.M)
+
+
+def parse_index(content):
+    """解析 DASHBOARD.md 內嵌的專案索引 {name: row}，沒有索引時回傳 None"""
+    m = _INDEX_RE.search(content)
+    return json.loads(m.group(1)) if m else None
+
+
+def render_index(projects):
+    """產生索引註解的各行：每個專案一行 JSON (diff 只顯示變動的專案)；字串中的 "-->" 轉義，避免提前結束註解"""
+    rows = [f"{json.dumps(name, ensure_ascii=False)}: {json.dumps(row, ensure_ascii=False)}" for name, row in projects.items()]
+    index = ("{\n" + ",\n".join(rows) + "\n}") if rows else "{}"
+    return [PROJECTS_INDEX, index.replace("-->", "--\\u003e"), "-->"]
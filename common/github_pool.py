@@ -0,0 +1,115 @@
+"""
+Shared GitHub Client Pool
+所有使用 GitHub API 的 skill 共用的連線層：
+- 每個 token 只建立一個 Github 物件 (共用 keep-alive 連線池)
+- 自動重試與退避：5xx、secondary rate limit (403/429 + Retry-After)
+- 每個 token 的 rate limit 預算追蹤：quota 快用完時等待 reset，
+  等待時間過長則丟出 RateBudgetExhausted，讓呼叫端改為延後處理 (例如 spool)
+"""
+
+import os
+import threading
+import time
+
+# 連線池大小 (背景 worker + 平行傳輸共用)
+POOL_SIZE = 10
+
+# HTTP 層重試次數與退避係數 (秒)
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 1.0
+
+# 每個 token 保留的 quota，低於此值時暫停寫入，留給互動式操作使用
+RATE_LIMIT_RESERVE = 50
+
+# quota 用完時最多等待多久 (秒)；超過則丟出 RateBudgetExhausted
+MAX_RATE_WAIT = 120
+
+# 建立新 client 時套用的預設參數 (呼叫端傳入的參數優先)。
+# 設定 GITHUB_API_URL 可改連 GitHub Enterprise 或本地的測試伺服器 (benchmarks/fake_github.py)。
+CLIENT_DEFAULTS = {}
+if os.environ.get("GITHUB_API_URL"):
+    CLIENT_DEFAULTS["base_url"] = os.environ["GITHUB_API_URL"]
+
+_clients = {}
+_budgets = {}
+_lock = threading.Lock()
+
+
+class RateBudgetExhausted(RuntimeError):
+    """quota 已用完，且距離 reset 的時間超過 MAX_RATE_WAIT"""
+
+
+class RateBudget:
+    """
+    追蹤單一 token 的 rate limit。剩餘量取自每個回應的 X-RateLimit-* header
+    (由 PyGithub 的 Requester 記錄)，不呼叫 GET /rate_limit：查詢本身不花費額外請求，
+    關閉 rate limit 的 GitHub Enterprise (該端點回應 404) 也能使用。
+    """
+    def __init__(self, github, reserve=RATE_LIMIT_RESERVE, max_wait=MAX_RATE_WAIT):
+        self.github = github
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        """最近一個回應的剩餘 quota；還沒有回應或伺服器不送 rate limit header 時為 None"""
+        remaining, limit = self.github.requester.rate_limiting
+        return remaining if limit >= 0 else None
+
+    def acquire(self, cost=1):
+        """
+        在送出 cost 個請求之前呼叫。quota 足夠 (或未知) 時立即返回；
+        不足時等待到 reset，若需等待超過 max_wait 則丟出 RateBudgetExhausted。
+        """
+        with self._lock:
+            requester = self.github.requester
+            remaining, limit = requester.rate_limiting
+            if limit < 0 or remaining - cost >= self.reserve:
+                return
+            wait = requester.rate_limiting_resettime - time.time()
+            if wait > self.max_wait:
+                raise RateBudgetExhausted(
+                    f"GitHub rate limit nearly exhausted ({remaining}/{limit} left), resets in {int(wait)}s"
+                )
+        # 在鎖外等待，其他共用此 token 的 thread 不會被卡在鎖上
+        if wait > 0:
+            print(f"⏳ Rate limit low ({remaining}/{limit} left), waiting {int(wait) + 1}s for reset...")
+            time.sleep(wait + 1)
+
+
+def get_github(token, **kwargs):
+    """
+    取得 token 對應的共用 Github 物件。同一個 token (與相同參數) 在整個程序中
+    只建立一次，因此 HTTP 連線會被重複使用。
+    """
+    key = (token, tuple(sorted(kwargs.items())))
+    with _lock:
+        if key not in _clients:
+            # 延遲載入 PyGithub，只 import 本模組不需付出 import 成本
+            from github import Github, GithubRetry
+
+            kwargs.setdefault("pool_size", POOL_SIZE)
+            kwargs.setdefault("retry", GithubRetry(total=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR))
+            # 讀取不需節流；寫入維持 PyGithub 預設的間隔以避免 secondary rate limit
+            kwargs.setdefault("seconds_between_requests", None)
+            for name, value in CLIENT_DEFAULTS.items():
+                kwargs.setdefault(name, value)
+            _clients[key] = Github(token, **kwargs)
+        return _clients[key]
+
+
+def get_budget(token, **kwargs):
+    """取得 token 對應的 RateBudget (與 get_github 共用同一個 Github 物件)"""
+    github = get_github(token, **kwargs)
+    with _lock:
+        if id(github) not in _budgets:
+            _budgets[id(github)] = RateBudget(github)
+        return _budgets[id(github)]
+
+
+def reset(token=None):
+    """丟棄共用的 Github 物件與 RateBudget (token 為 None 時全部丟棄)；下次 get_github() 會以目前的 CLIENT_DEFAULTS 重新建立"""
+    with _lock:
+        for key in [key for key in _clients if token is None or key[0] == token]:
+            _budgets.pop(id(_clients.pop(key)), None)
@@ -0,0 +1,281 @@
+"""
+Skill Metrics (opt-in)
+量測 skill client 的熱點操作 (reporter.log、memory.push、workspace.sync ...)：
+- 每個操作的耗時、GitHub API 請求數、傳輸量 (bytes)、重試次數、剩餘 rate limit
+- API 請求由 PyGithub 的 "github.Requester" DEBUG log 取得 (不修改 PyGithub)，
+  HTTP 層重試由 urllib3 的 "urllib3.util.retry" log 取得
+- 輸出到 JSONL (每個操作一行) 或 Prometheus textfile (依操作名稱累計)
+
+啟用方式 (預設關閉，關閉時 operation() 幾乎沒有成本)：
+    export SKILL_METRICS=.agent/metrics.jsonl     # 或 .agent/metrics.prom
+或在程式中呼叫 metrics.enable(".agent/metrics.prom")。
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+ENV_VAR = "SKILL_METRICS"
+
+# Prometheus textfile 的指標名稱前綴
+PROM_PREFIX = "agent_skill"
+
+_COUNTERS = ("api_calls", "bytes_in", "bytes_out", "retries", "errors")
+_PROM_LINE_RE = re.compile(r'^(\w+)\{op="([^"]*)"\} ([0-9.eE+-]+)$')
+
+_lock = threading.Lock()
+_local = threading.local()
+_state = {"path": None, "fmt": None, "totals": {}, "rate_remaining": None}
+
+
+class _Operation:
+    """一次操作的量測結果；巢狀操作的請求數也會計入外層"""
+
+    def __init__(self, name, parent, labels):
+        self.name = name
+        self.parent = parent
+        self.labels = labels
+        self.start = time.perf_counter()
+        self.counters = dict.fromkeys(_COUNTERS, 0)
+        self.status = {}
+        self.rate_remaining = None
+
+    def record(self):
+        return {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "op": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 2),
+            **self.counters,
+            "status": self.status,
+            "rate_remaining": self.rate_remaining,
+            **self.labels,
+        }
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _active():
+    """目前 thread 上的操作 (由內到外)"""
+    op = _stack()[-1] if _stack() else None
+    chain = []
+    while op is not None:
+        chain.append(op)
+        op = op.parent
+    return chain
+
+
+class _RequestHandler(logging.Handler):
+    """接收 PyGithub 每個請求的 DEBUG log，計入目前的操作"""
+
+    def emit(self, record):
+        chain = _active()
+        if not chain:
+            return
+        if record.name.startswith("urllib3"):
+            count("retries")
+            return
+        try:
+            # "%s %s://%s%s %s %s ==> %i %s %s": verb, scheme, host, url, headers, input, status, resp headers, output
+            _verb, _scheme, _host, _url, _headers, body, status, resp_headers, output = record.args
+        except (TypeError, ValueError):
+            return
+        sent = len(body.encode("utf-8")) if isinstance(body, str) else len(body or b"")
+        received = len(output.encode("utf-8")) if isinstance(output, str) else 0
+        remaining = (resp_headers or {}).get("x-ratelimit-remaining")
+        with _lock:
+            for op in chain:
+                op.counters["api_calls"] += 1
+                op.counters["bytes_out"] += sent
+                op.counters["bytes_in"] += received
+                op.status[str(status)] = op.status.get(str(status), 0) + 1
+                if remaining is not None:
+                    op.rate_remaining = int(remaining)
+            if remaining is not None:
+                _state["rate_remaining"] = int(remaining)
+
+
+_handler = _RequestHandler(logging.DEBUG)
+_LOGGERS = ("github.Requester", "urllib3.util.retry")
+_saved_levels = {}
+
+
+def enabled():
+    return _state["path"] is not None
+
+
+def enable(path=None, fmt=None):
+    """
+    開始記錄到 path (預設取 SKILL_METRICS 環境變數)。
+    fmt: "jsonl" 或 "prom"；未指定時依副檔名判斷 (.prom → Prometheus)。
+    """
+    path = path or os.environ.get(ENV_VAR)
+    if not path:
+        return False
+    with _lock:
+        if _state["path"] is None:
+            for name in _LOGGERS:
+                logger = logging.getLogger(name)
+                _saved_levels[name] = (logger.level, logger.propagate)
+                logger.addHandler(_handler)
+                if logger.getEffectiveLevel() > logging.DEBUG:
+                    # 只為了量測而打開 DEBUG，不要讓這些紀錄出現在使用者的 log
+                    logger.setLevel(logging.DEBUG)
+                    logger.propagate = False
+            atexit.register(flush)
+        _state["path"] = path
+        _state["fmt"] = fmt or ("prom" if path.endswith(".prom") else "jsonl")
+        if _state["fmt"] == "prom":
+            _state["totals"] = _load_prom(path)
+    return True
+
+
+def disable():
+    flush()
+    with _lock:
+        for name, (level, propagate) in _saved_levels.items():
+            logger = logging.getLogger(name)
+            logger.removeHandler(_handler)
+            logger.setLevel(level)
+            logger.propagate = propagate
+        _saved_levels.clear()
+        _state.update(path=None, fmt=None, totals={})
+
+
+@contextmanager
+def operation(name, **labels):
+    """
+    量測一個操作。未啟用時直接執行，不做任何記錄：
+        with operation("reporter.log", project="A"):
+            ...
+    """
+    if _state["path"] is None:
+        yield None
+        return
+    stack = _stack()
+    op = _Operation(name, stack[-1] if stack else None, labels)
+    stack.append(op)
+    try:
+        yield op
+    except BaseException:
+        op.counters["errors"] += 1
+        raise
+    finally:
+        stack.pop()
+        _finish(op)
+
+
+def timed(name):
+    """operation() 的 decorator 版本"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with operation(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(key, n=1):
+    """把 n 計入目前 thread 上的操作 (含外層)；key 不在預設欄位時會新增欄位"""
+    chain = _active()
+    if not chain:
+        return
+    with _lock:
+        for op in chain:
+            op.counters[key] = op.counters.get(key, 0) + n
+
+
+def wrap(fn):
+    """讓 thread pool 中執行的 fn 計入呼叫端目前的操作"""
+    stack = _stack()
+    if _state["path"] is None or not stack:
+        return fn
+    parent = stack[-1]
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        inner = _stack()
+        inner.append(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            inner.pop()
+    return wrapper
+
+
+def _finish(op):
+    record = op.record()
+    path = _state["path"]
+    if path is None:
+        return
+    with _lock:
+        if _state["fmt"] == "jsonl":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        totals = _state["totals"]
+        key = op.name
+        totals[("operations_total", key)] = totals.get(("operations_total", key), 0) + 1
+        totals[("duration_seconds_total", key)] = totals.get(("duration_seconds_total", key), 0) + record["duration_ms"] / 1000
+        for counter, value in op.counters.items():
+            totals[(f"{counter}_total", key)] = totals.get((f"{counter}_total", key), 0) + value
+    if op.parent is None:
+        flush()
+
+
+def _load_prom(path):
+    totals = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                m = _PROM_LINE_RE.match(line.strip())
+                if m and m.group(1).startswith(PROM_PREFIX + "_") and m.group(1) != f"{PROM_PREFIX}_rate_limit_remaining":
+                    totals[(m.group(1)[len(PROM_PREFIX) + 1:], m.group(2))] = float(m.group(3))
+    except OSError:
+        pass
+    return totals
+
+
+def _prom_value(value):
+    """整數值寫成整數、其餘以 repr() 保留完整精度 (檔案會被 _load_prom 讀回繼續累加，不能四捨五入)"""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def flush():
+    """把 Prometheus 累計值寫入檔案 (JSONL 在每個操作結束時就已寫入)"""
+    with _lock:
+        if _state["fmt"] != "prom" or not _state["totals"]:
+            return
+        path = _state["path"]
+        lines = []
+        for metric in sorted({m for m, _op in _state["totals"]}):
+            name = f"{PROM_PREFIX}_{metric}"
+            kind = "counter" if metric.endswith("_total") else "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            for (m, op), value in sorted(_state["totals"].items()):
+                if m == metric:
+                    lines.append(f'{name}{{op="{op}"}} {_prom_value(value)}')
+        if _state["rate_remaining"] is not None:
+            lines.append(f"# TYPE {PROM_PREFIX}_rate_limit_remaining gauge")
+            lines.append(f"{PROM_PREFIX}_rate_limit_remaining {_state['rate_remaining']}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(path + ".tmp", path)
+
+
+# 設定了環境變數就自動啟用
+enable()
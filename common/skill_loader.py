@@ -0,0 +1,205 @@
+"""
+Skill Loader
+在 session 開始時載入 skill 程式碼 (例如 reporter_client.py)，取代「每次下載再 exec()」：
+- 程式碼依 git SHA 快取在本機 (~/.cache/agent-skills)，同一版本只下載一次，
+  只有內容變動的檔案 (blob SHA 不同) 才會重新下載
+- 新鮮度檢查只需一個 conditional request (ETag；304 不計入 rate limit)，
+  且在 FRESHNESS_TTL 秒內完全不連網；ref 為 commit SHA 時永不重新檢查
+- 以一般 import 載入，Python 會在快取目錄寫入 __pycache__ bytecode，下次直接使用
+- 離線或 GitHub 無法連線時，使用該 ref 上次快取的版本
+只使用標準函式庫，因此可以在 skill 的相依套件 (PyGithub) 載入之前執行。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import base64
+import hashlib
+import argparse
+import importlib
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+CACHE_DIR = os.environ.get("AGENT_SKILLS_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "agent-skills")
+
+# skills 在 repo 中的位置 (AI_Command_Center 為 .agent/skills；shared-agent-skills 本身為 "")
+SKILLS_PREFIX = ".agent/skills"
+
+# 每個 skill 都會一起下載的共用目錄 (例如 common/github_pool.py)
+SHARED_DIRS = ["common"]
+
+# 上次檢查後多久內不再連網檢查 (秒)
+FRESHNESS_TTL = 600
+
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 10
+
+_COMMIT_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+def _request(path, token=None, etag=None):
+    """GET API_URL + path，回傳 (status, etag, json)；304 時 json 為 None"""
+    req = urllib.request.Request(API_URL + path, headers={"Accept": "application/vnd.github+json"})
+    if token:
+        req.add_header("Authorization", f"token {token}")
+    if etag:
+        req.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
+            return resp.status, resp.headers.get("ETag"), json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, etag, None
+        raise
+
+
+def _read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_file(path, data):
+    """先寫暫存檔再 rename，多個 process 同時載入也不會讀到寫一半的檔案"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def repo_cache_dir(repo):
+    return os.path.join(CACHE_DIR, repo.replace("/", "__"))
+
+
+def resolve_tree(repo, ref=None, token=None, ttl=FRESHNESS_TTL, prefix=SKILLS_PREFIX):
+    """
+    回傳 ref 上 prefix 目錄的 git tree SHA (內容的版本鍵)。
+    TTL 內或 ref 為 commit SHA 時直接使用快取；否則送出一個 conditional request。
+    連線失敗時退回上次的結果。
+    """
+    cache = repo_cache_dir(repo)
+    refs_path = os.path.join(cache, "refs.json")
+    refs = _read_json(refs_path, {})
+    key = f"{ref or 'HEAD'}:{prefix}"
+    state = refs.get(key)
+    if state and (ttl is None or time.time() - state["checked"] < ttl or _COMMIT_SHA_RE.match(ref or "")):
+        return state["tree"]
+
+    query = f"?ref={quote(ref, safe='')}" if ref else ""
+    try:
+        if prefix:
+            parent, _, name = prefix.rstrip("/").rpartition("/")
+            status, etag, body = _request(f"/repos/{repo}/contents/{quote(parent)}{query}", token, state and state["etag"])
+            if body is not None:
+                entry = next((e for e in body if e["name"] == name and e["type"] == "dir"), None)
+                if entry is None:
+                    raise FileNotFoundError(f"{prefix} not found in {repo}")
+                tree = entry["sha"]
+        else:
+            status, etag, body = _request(f"/repos/{repo}/commits/{quote(ref or 'HEAD', safe='')}", token, state and state["etag"])
+            if body is not None:
+                tree = body["commit"]["tree"]["sha"]
+    except (urllib.error.URLError, OSError) as e:
+        if state:
+            print(f"⚠️ Could not check {repo} for skill updates ({e}); using cached version")
+            return state["tree"]
+        raise
+    if status == 304:
+        tree = state["tree"]
+
+    refs = _read_json(refs_path, {})
+    refs[key] = {"tree": tree, "etag": etag, "checked": time.time()}
+    _write_file(refs_path, json.dumps(refs, indent=2).encode("utf-8"))
+    return tree
+
+
+def _tree_files(repo, tree_sha, token):
+    """tree SHA → {相對路徑: blob SHA}；tree 內容不會變，所以永久快取"""
+    path = os.path.join(repo_cache_dir(repo), "trees", f"{tree_sha}.json")
+    files = _read_json(path, None)
+    if files is None:
+        _status, _etag, body = _request(f"/repos/{repo}/git/trees/{tree_sha}?recursive=1", token)
+        files = {e["path"]: e["sha"] for e in body["tree"] if e["type"] == "blob"}
+        _write_file(path, json.dumps(files, indent=2).encode("utf-8"))
+    return files
+
+
+def _blob(repo, sha, token):
+    """依 blob SHA 取得檔案內容 (本機 blob 快取沒有才下載)"""
+    path = os.path.join(repo_cache_dir(repo), "blobs", sha)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    _status, _etag, body = _request(f"/repos/{repo}/git/blobs/{sha}", token)
+    data = base64.b64decode(body["content"])
+    if hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest() != sha:
+        raise ValueError(f"Blob {sha} from {repo} failed verification")
+    _write_file(path, data)
+    return data
+
+
+def materialize(repo, tree_sha, skills, token=None):
+    """
+    把 skills (與 SHARED_DIRS) 的檔案展開到 snapshots/<tree SHA>/，回傳該目錄。
+    同一個 tree SHA 的內容固定不變，已展開的檔案不會再寫入 (保留 __pycache__)。
+    """
+    root = os.path.join(repo_cache_dir(repo), "snapshots", tree_sha)
+    dirs = tuple(f"{d}/" for d in list(skills) + SHARED_DIRS)
+    wanted = {
+        rel: sha for rel, sha in _tree_files(repo, tree_sha, token).items()
+        if rel.startswith(dirs) and "__pycache__" not in rel
+        and not os.path.exists(os.path.join(root, *rel.split("/")))
+    }
+    if wanted:
+        def fetch(item):
+            rel, sha = item
+            _write_file(os.path.join(root, *rel.split("/")), _blob(repo, sha, token))
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            list(pool.map(fetch, wanted.items()))
+    return root
+
+
+def load_skill(repo, skill, module, token=None, ref=None, ttl=FRESHNESS_TTL, prefix=SKILLS_PREFIX):
+    """
+    從 repo 載入 skill 的模組並回傳，例如：
+        reporter_client = load_skill("owner/AI_Command_Center", "command_center_reporter", "reporter_client", TOKEN)
+        reporter = reporter_client.ProjectReporter(TOKEN)
+    ref: branch、tag 或 commit SHA (預設為 default branch)
+    ttl: 多久內不重新檢查 (秒)；None 表示有快取就不檢查
+    """
+    token = token or os.environ.get("GITHUB_TOKEN")
+    tree_sha = resolve_tree(repo, ref, token, ttl, prefix)
+    skill_dir = os.path.join(materialize(repo, tree_sha, [skill], token), skill)
+    if not os.path.isdir(skill_dir):
+        raise ImportError(f"Skill {skill} not found in {repo}")
+
+    # 同一個 process 先前載入過其他版本時，換成這個版本
+    loaded = sys.modules.get(module)
+    if loaded is not None and os.path.dirname(os.path.abspath(getattr(loaded, "__file__", "") or "")) != skill_dir:
+        del sys.modules[module]
+    if skill_dir not in sys.path:
+        sys.path.insert(0, skill_dir)
+    return importlib.import_module(module)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download skills into the local cache (no import)")
+    parser.add_argument("repo", help="owner/name")
+    parser.add_argument("skills", nargs="+")
+    parser.add_argument("--ref", help="branch, tag or commit SHA")
+    parser.add_argument("--prefix", default=SKILLS_PREFIX, help="skills 在 repo 中的目錄")
+    args = parser.parse_args()
+    token = os.environ.get("GITHUB_TOKEN")
+    tree_sha = resolve_tree(args.repo, args.ref, token, 0, args.prefix)
+    print(f"✅ {args.repo}@{args.ref or 'HEAD'}: {materialize(args.repo, tree_sha, args.skills, token)}")
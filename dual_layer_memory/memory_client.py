@@ -2,12 +2,399 @@
 """
 Memory Sync Client
 用於同步本地 memory/ 資料夾與 Private Data Repo。
+Delta sync：以 git blob SHA 比對本地、遠端與上次同步的 manifest，
+沒有變動的檔案完全不下載/上傳；沒有任何變動時只需讀取一次遠端 tree。
+同步整個 memory/ 目錄 (可用 include/exclude glob 過濾)，下載平行進行，
+所有上傳的檔案合併成一個 commit。
+兩邊都改過的檔案以上次同步的版本為 base，依 Markdown 章節做三方合併，
+只有真正的衝突才會以 <<<<<<< / >>>>>>> 標記留給使用者處理。
+compact (或 push --compact) 壓縮熱檔案：較舊的 CONVERSATIONS 條目移到 memory/archive/ 的月份檔，
+月份檔只在需要時才 pull (--include)，熱檔案維持在固定大小以內。
 """
 import os
 import sys
-from github import Github
+import json
+import base64
+import hashlib
+import argparse
+import fnmatch
+import difflib
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from github import Github, GithubException, InputGitTreeElement
+
+# 共用 GitHub 連線層 (common/github_pool.py) 與量測 (common/metrics.py)
+_COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common")
+if _COMMON_DIR not in sys.path:
+    sys.path.insert(0, _COMMON_DIR)
+try:
+    from github_pool import get_github, get_budget
+except ImportError:
+    get_github = Github
+    get_budget = None
+try:
+    from metrics import operation, timed, wrap as metrics_wrap
+except ImportError:
+    def operation(name, **labels):
+        return nullcontext()
+
+    def timed(name):
+        return lambda fn: fn
+
+    def metrics_wrap(fn):
+        return fn
+
+# 上次同步時各檔案的 blob SHA (本地檔案，不會被同步)
+MANIFEST_NAME = ".sync_manifest.json"
+
+# 預設同步 memory/ 底下的所有檔案，排除隱藏檔 (例如 manifest)
+DEFAULT_INCLUDE = ["*"]
+DEFAULT_EXCLUDE = [".*", "*/.*"]
+
+# 平行下載的數量
+MAX_WORKERS = 8
+# push 時遠端 memory/ 被改動 (別台機器同時 push) 的重試次數
+PUSH_ATTEMPTS = 3
+CONFLICT_MARKER = b"<<<<<<< local"
+BINARY_CONFLICT = "(not a text file)"   # 無法合併的檔案：保留本地版本
+INDEX_NAME = ".search_index.json"
+INDEX_VERSION = 1
+SEARCH_LIMIT = 5
+HOT_CONVERSATIONS = 20          # CONVERSATIONS.md 保留最近幾筆
+HOT_MAX_BYTES = 16 * 1024       # 熱檔案的大小上限
+ARCHIVE_DIR = "archive"
+LAZY_GLOBS = ["archive/*/[0-9][0-9][0-9][0-9]-[0-9][0-9].md"]  # 月份檔預設不 pull
+
+_ENTRY_RE = re.compile(r"^###\s+(\d{4}-\d{2})-\d{2}")
+_STATUS_RE = re.compile(r"\*\*Status\*\*\s*[:：]\s*([^\n]+)")
+_INDEX_ROW_RE = re.compile(r"^\| (\d{4}-\d{2}-\d{2}) \| (.*?) \| (.*?) \| (.*?) \| \[(\d{4}-\d{2})\]")
+
+_TOKEN_RE = re.compile(r"[a-z0-9_][a-z0-9_.+-]*[a-z0-9_+]|[a-z0-9_]|[\u3400-\u9fff\uf900-\ufaff]+")
+_PROJECT_RE = re.compile(r"\*\*Project\*\*\s*[:：]\s*([^\n]+)")
+_PROJECT_PATH_RE = re.compile(r"\bprojects/([\w.-]+)")
+
+
+def blob_sha(data):
+    """與 git hash-object 相同的 blob SHA"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _is_text(data):
+    """UTF-8 文字檔 (可合併、可內嵌在 tree 中)；其他視為二進位檔"""
+    try:
+        data.decode("utf-8")
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def load_manifest(local_dir):
+    path = os.path.join(local_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def save_manifest(local_dir, manifest):
+    path = os.path.join(local_dir, MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def remote_tree(repo, prefix, ref=None):
+    """
+    一次讀取遠端整棵 tree (預設 default branch)，回傳 (tree sha, {prefix 底下的相對路徑: blob sha})。
+    """
+    tree = repo.get_git_tree(ref or repo.default_branch, recursive=True)
+    return tree.sha, {
+        el.path[len(prefix):]: el.sha
+        for el in tree.tree
+        if el.type == "blob" and el.path.startswith(prefix)
+    }
+
+
+def is_selected(rel_path, include, exclude):
+    """rel_path (以 / 分隔) 是否符合 include 且不符合 exclude"""
+    return (any(fnmatch.fnmatch(rel_path, p) for p in include)
+            and not any(fnmatch.fnmatch(rel_path, p) for p in exclude))
+
+
+def list_local(local_dir, include, exclude):
+    """列出本地 memory/ 底下符合條件的檔案，回傳 {相對路徑: bytes}"""
+    files = {}
+    for root, _dirs, names in os.walk(local_dir):
+        for name in names:
+            full_path = os.path.join(root, name)
+            rel_path = os.path.relpath(full_path, local_dir).replace(os.sep, "/")
+            if is_selected(rel_path, include, exclude):
+                with open(full_path, "rb") as f:
+                    files[rel_path] = f.read()
+    return files
+
+
+def split_sections(text):
+    """
+    依 Markdown 標題切成章節，回傳 [(key, lines)]。
+    key 為 (標題行, 第幾次出現)；第一個標題之前的內容 key 為 ("", 0)。
+    程式碼區塊 (```) 內的 # 不視為標題。
+    """
+    sections = [(("", 0), [])]
+    seen = {}
+    in_fence = False
+    for line in text.split("\n"):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and line.startswith("#"):
+            heading = line.rstrip()
+            seen[heading] = seen.get(heading, 0) + 1
+            sections.append(((heading, seen[heading]), [line]))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def merge_lines(base, local, remote):
+    """
+    行層級的三方合併 (diff3)。回傳 (lines, conflict)。
+    兩邊在同一位置都只是「新增」時 (例如都在清單頂端加了項目)，兩邊的新增都保留。
+    """
+    def matches(a, b):
+        return {
+            m.a + n: m.b + n
+            for m in difflib.SequenceMatcher(None, a, b, autojunk=False).get_matching_blocks()
+            for n in range(m.size)
+        }
+
+    to_local, to_remote = matches(base, local), matches(base, remote)
+    stable = [(i, to_local[i], to_remote[i]) for i in range(len(base)) if i in to_local and i in to_remote]
+    stable.append((len(base), len(local), len(remote)))
+
+    result, conflict = [], False
+    b0 = l0 = r0 = 0
+    for b1, l1, r1 in stable:
+        chunk_b, chunk_l, chunk_r = base[b0:b1], local[l0:l1], remote[r0:r1]
+        if chunk_l == chunk_b:
+            result += chunk_r
+        elif chunk_r == chunk_b or chunk_l == chunk_r:
+            result += chunk_l
+        elif not chunk_b:
+            result += chunk_l + [line for line in chunk_r if line not in chunk_l]
+        else:
+            conflict = True
+            result += [CONFLICT_MARKER.decode()] + chunk_l + ["======="] + chunk_r + [">>>>>>> remote"]
+        if b1 < len(base):
+            result.append(base[b1])
+        b0, l0, r0 = b1 + 1, l1 + 1, r1 + 1
+    return result, conflict
+
+
+def merge_markdown(base, local, remote):
+    """
+    以章節為單位的三方合併。回傳 (merged text, 有衝突的章節標題列表)。
+    只有一邊改過的章節直接採用該邊；兩邊都改過才做行層級合併。
+    """
+    base_s, local_s, remote_s = (dict(split_sections(t)) for t in (base, local, remote))
+    local_keys = [k for k, _ in split_sections(local)]
+    remote_keys = [k for k, _ in split_sections(remote)]
+
+    # 章節順序以本地為主，遠端新增的章節插在它在遠端的前一個章節之後
+    keys = list(local_keys)
+    for i, key in enumerate(remote_keys):
+        if key not in keys:
+            prev = next((k for k in reversed(remote_keys[:i]) if k in keys), None)
+            keys.insert(keys.index(prev) + 1 if prev else 0, key)
+
+    merged, conflicts = [], []
+    for key in keys:
+        b, l, r = base_s.get(key), local_s.get(key), remote_s.get(key)
+        if l == r or r == b:
+            lines = l
+        elif l == b:
+            lines = r
+        elif l is None or r is None:
+            # 一邊刪除、一邊修改：保留修改的版本，但提醒使用者
+            lines = l if r is None else r
+            conflicts.append(key[0] or "(preamble)")
+        else:
+            lines, conflict = merge_lines(b or [], l, r)
+            if conflict:
+                conflicts.append(key[0] or "(preamble)")
+        if lines is not None:
+            merged.extend(lines)
+    return "\n".join(merged), conflicts
+
+
+def three_way_merge(repo, rel_path, local_data, remote_sha, base_sha):
+    """
+    下載 base 與遠端版本後合併，回傳 (merged bytes, 衝突章節列表)；base_sha 為 None 時以空檔為 base。
+    任一版本不是 UTF-8 文字檔時不合併：回傳本地內容與 [BINARY_CONFLICT]。
+    """
+    if not _is_text(local_data):
+        return local_data, [BINARY_CONFLICT]
+    remote = base64.b64decode(repo.get_git_blob(remote_sha).content)
+    base = base64.b64decode(repo.get_git_blob(base_sha).content) if base_sha else b""
+    if not (_is_text(remote) and _is_text(base)):
+        return local_data, [BINARY_CONFLICT]
+    merged, conflicts = merge_markdown(base.decode("utf-8"), local_data.decode("utf-8"), remote.decode("utf-8"))
+    return merged.encode("utf-8"), conflicts
+
+
+def write_local(local_dir, rel_path, data):
+    local_path = os.path.join(local_dir, *rel_path.split("/"))
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+    with open(local_path, "wb") as f:
+        f.write(data)
+
+
+def report_conflicts(rel_path, conflicts):
+    if conflicts == [BINARY_CONFLICT]:
+        print(f"⚠️ {rel_path} changed on both sides and is not a text file: kept the local copy.")
+        print(f"   The next push publishes it; to keep the remote version instead, delete memory/{rel_path} and pull.")
+        return
+    print(f"⚠️ Merge conflict in {rel_path}: {', '.join(conflicts)}")
+    print(f"   Resolve the <<<<<<< / >>>>>>> markers in memory/{rel_path}, then push again.")
+
+
+def pull(repo, local_dir, remote_shas, manifest, include, exclude):
+    """下載遠端有變動的檔案 (平行)；兩邊都改過的檔案做三方合併"""
+    local_files = list_local(local_dir, include, exclude)
+    to_fetch = []
+    for rel_path, remote_sha in sorted(remote_shas.items()):
+        if not is_selected(rel_path, include, exclude):
+            continue
+        local_sha = blob_sha(local_files[rel_path]) if rel_path in local_files else None
+        if remote_sha == local_sha:
+            manifest[rel_path] = remote_sha
+            print(f"⏹️ No changes: {rel_path}")
+        elif local_sha is not None and remote_sha == manifest.get(rel_path):
+            # 遠端自上次同步後沒變，差異來自本地尚未 push 的修改
+            print(f"⏹️ No remote changes: {rel_path} (local edits not pushed yet)")
+        elif local_sha is not None and local_sha != manifest.get(rel_path):
+            # 兩邊自上次同步後都改過；沒有 manifest 記錄時 (從未同步過，例如升級後第一次同步)
+            # 以空檔為 base 合併，不直接覆蓋本地內容
+            to_fetch.append((rel_path, remote_sha, manifest.get(rel_path), True))
+        else:
+            # 本地沒有此檔案，或自上次同步後沒改過：直接使用遠端版本
+            to_fetch.append((rel_path, remote_sha, None, False))
+
+    def fetch(item):
+        rel_path, remote_sha, base_sha, merge = item
+        try:
+            if merge:
+                data, conflicts = three_way_merge(repo, rel_path, local_files[rel_path], remote_sha, base_sha)
+                # 合併結果與遠端相同時，沒有需要 push 的本地修改
+                merge = blob_sha(data) != remote_sha
+            else:
+                data, conflicts = base64.b64decode(repo.get_git_blob(remote_sha).content), []
+            write_local(local_dir, rel_path, data)
+            return rel_path, remote_sha, merge, conflicts, None
+        except Exception as e:
+            return rel_path, remote_sha, merge, [], e
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for rel_path, remote_sha, merge, conflicts, error in pool.map(metrics_wrap(fetch), to_fetch):
+            if error:
+                print(f"⚠️ Could not pull {rel_path}: {error}")
+                continue
+            # 合併結果視為「遠端版本 + 本地尚未 push 的修改」
+            manifest[rel_path] = remote_sha
+            if conflicts:
+                report_conflicts(rel_path, conflicts)
+            elif merge:
+                print(f"🔀 Merged: {rel_path} (push to publish local edits)")
+            else:
+                print(f"✅ Extracted: {rel_path}")
+
+
+def push(repo, local_dir, tree_sha, remote_shas, manifest, include, exclude, budget=None):
+    """
+    上傳本地有變動的檔案，全部合併成一個 commit。
+    budget: common/github_pool.py 的 RateBudget，寫入前確認 quota (與 reporter 共用同一個 token 的預算)。
+    回傳 False 表示遠端的 memory/ 在讀取 tree 之後被改過，需要重新比對。
+    """
+    changed, merged = {}, set()
+    for rel_path, data in sorted(list_local(local_dir, include, exclude).items()):
+        local_sha = blob_sha(data)
+        remote_sha = remote_shas.get(rel_path)
+        if local_sha == remote_sha:
+            manifest[rel_path] = local_sha
+            print(f"⏹️ No changes: {rel_path}")
+        elif CONFLICT_MARKER in data:
+            print(f"⚠️ Unresolved merge conflict: {rel_path} (not pushed)")
+        elif remote_sha is not None and local_sha == manifest.get(rel_path):
+            # 本地自上次同步後沒變，遠端較新：不要用舊內容覆蓋
+            print(f"⚠️ Remote is newer: {rel_path} (run pull first)")
+        elif remote_sha is not None and remote_sha != manifest.get(rel_path):
+            # 兩邊自上次同步後都改過，或沒有 manifest 記錄 (從未同步過、兩台機器各自寫入同一個檔案)：
+            # 先合併 (沒有記錄時以空檔為 base)，不直接覆蓋遠端
+            data, conflicts = three_way_merge(repo, rel_path, data, remote_sha, manifest.get(rel_path))
+            write_local(local_dir, rel_path, data)
+            if conflicts:
+                manifest[rel_path] = remote_sha
+                report_conflicts(rel_path, conflicts)
+            else:
+                changed[rel_path] = data
+                merged.add(rel_path)
+        else:
+            changed[rel_path] = data
+
+    if not changed:
+        return True
+
+    ref = repo.get_git_ref(f"heads/{repo.default_branch}")
+    head = repo.get_git_commit(ref.object.sha)
+    # 遠端有新的 commit 時，只有 memory/ 底下的變動需要重新比對
+    # (例如 reporter 更新 DASHBOARD.md 不影響這次 push，新的 tree 以 head 為 base)
+    if head.tree.sha != tree_sha and remote_tree(repo, "memory/", head.tree.sha)[1] != remote_shas:
+        return False
+
+    if budget is not None:
+        # tree + commit + ref，加上每個非文字檔一個 blob
+        budget.acquire(3 + sum(1 for data in changed.values() if not _is_text(data)))
+    elements = []
+    for rel_path, data in changed.items():
+        if _is_text(data):
+            # 文字檔直接內嵌在 tree 中，省去每個檔案一次 blob POST
+            elements.append(InputGitTreeElement(f"memory/{rel_path}", "100644", "blob", content=data.decode("utf-8")))
+        else:
+            blob = repo.create_git_blob(base64.b64encode(data).decode("ascii"), "base64")
+            elements.append(InputGitTreeElement(f"memory/{rel_path}", "100644", "blob", sha=blob.sha))
+    tree = repo.create_git_tree(elements, base_tree=head.tree)
+    names = ", ".join(list(changed)[:5]) + (f" (+{len(changed) - 5} more)" if len(changed) > 5 else "")
+    commit = repo.create_git_commit(f"🧠 Memory Update: {names}", tree, [head])
+    try:
+        ref.edit(commit.sha, force=False)
+    except GithubException as e:
+        if e.status == 422:
+            # 非 fast-forward：遠端在這段時間被推進
+            return False
+        raise
+
+    for rel_path, data in changed.items():
+        manifest[rel_path] = blob_sha(data)
+        print(f"{'🔀 Merged' if rel_path in merged else '✅ Updated' if rel_path in remote_shas else '✅ Created'}: {rel_path}")
+    return True
+
+
+def sync_memory(action, include=None, exclude=None, compact=False):
+    """
+    同步本地 memory/ 與 PRIVATE_DATA_REPO 的 memory/。
+    action: "pull" 或 "push"
+    include/exclude: glob 列表，以 memory/ 底下的相對路徑比對 (例如 "topics/*.md")
+    compact: push 前先壓縮熱檔案 (compact_memory)；會改寫本地檔案，因此預設關閉
+    """
+    # 月份檔只在明確 --include 時才 pull
+    lazy = LAZY_GLOBS if action == "pull" and not include else []
+    include = include or DEFAULT_INCLUDE
+    exclude = DEFAULT_EXCLUDE + lazy + (exclude or [])
 
-def sync_memory(action):
     # 1. Get Config
     token = os.environ.get("GITHUB_TOKEN")
     if not token:
@@ -23,54 +410,447 @@ def sync_memory(action):
         print("❌ PRIVATE_DATA_REPO not set in environment.")
         return
 
-    g = Github(token)
+    with operation(f"memory.{action}", repo=repo_name):
+        _sync(action, token, repo_name, include, exclude, compact)
+
+
+def _sync(action, token, repo_name, include, exclude, compact=False):
+    """sync_memory() 的主體 (設定已確認)"""
+    g = get_github(token)
     repo = g.get_repo(repo_name)
     
-    files_to_sync = ["SHORT_TERM.md", "LONG_TERM.md"]
     local_dir = "memory"
     
     if not os.path.exists(local_dir):
         os.makedirs(local_dir)
 
+    manifest = load_manifest(local_dir)
+    budget = get_budget(token) if get_budget else None
+
     # 2. Execute Action
     if action == "pull":
         print(f"📥 Pulling memory from {repo_name}...")
-        for filename in files_to_sync:
-            try:
-                remote_path = f"memory/{filename}"
-                content = repo.get_contents(remote_path).decoded_content.decode("utf-8")
-                
-                local_path = os.path.join(local_dir, filename)
-                with open(local_path, "w", encoding="utf-8") as f:
-                    f.write(content)
-                print(f"✅ Extracted: {filename}")
-            except Exception as e:
-                print(f"⚠️ Could not pull {filename} (maybe new repo?): {e}")
+        try:
+            _tree_sha, remote_shas = remote_tree(repo, "memory/")
+        except Exception as e:
+            print(f"❌ Could not read remote tree of {repo_name}: {e}")
+            return
+        pull(repo, local_dir, remote_shas, manifest, include, exclude)
 
     elif action == "push":
+        if compact:
+            compact_memory(local_dir)
         print(f"📤 Pushing memory to {repo_name}...")
-        for filename in files_to_sync:
-            local_path = os.path.join(local_dir, filename)
-            if os.path.exists(local_path):
-                with open(local_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                
-                remote_path = f"memory/{filename}"
-                try:
-                    # Try to update existing file
-                    remote_file = repo.get_contents(remote_path)
-                    if remote_file.decoded_content.decode("utf-8") != content:
-                        repo.update_file(remote_path, f"🧠 Memory Update: {filename}", content, remote_file.sha)
-                        print(f"✅ Updated: {filename}")
-                    else:
-                        print(f"⏹️ No changes: {filename}")
-                except:
-                    # File doesn't exist, create it
-                    repo.create_file(remote_path, f"🧠 Memory Init: {filename}", content)
-                    print(f"✅ Created: {filename}")
+        for _attempt in range(PUSH_ATTEMPTS):
+            try:
+                tree_sha, remote_shas = remote_tree(repo, "memory/")
+                if push(repo, local_dir, tree_sha, remote_shas, manifest, include, exclude, budget):
+                    break
+                print("🔄 Remote memory changed while pushing, comparing again...")
+            except Exception as e:
+                print(f"❌ Failed to push memory: {e}")
+                break
+        else:
+            print(f"❌ Failed to push memory: remote kept changing ({PUSH_ATTEMPTS} attempts). Local edits were not pushed, run push again.")
+
+    save_manifest(local_dir, manifest)
+
+
+# --- Compaction ---
+# memory/archive/conversations/YYYY-MM.md  舊的 CONVERSATIONS 條目 (依日期新到舊)
+# memory/archive/conversations/INDEX.md    每筆封存條目一行的摘要表
+# memory/archive/short_term/YYYY-MM.md     SHORT_TERM 中已勾選 (- [x]) 的任務
+# 先寫封存檔再改熱檔案，已存在的條目不重複寫入，所以中斷後重跑是安全的。
+
+def _read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+def _add_to_shard(path, title, entries, key=lambda entry: ""):
+    """把 entries (文字區塊) 加入月份檔，略過已存在的，依 key 由新到舊排序。回傳新增數量"""
+    existing = _read_text(path)
+    blocks = []
+    if existing:
+        blocks = ["\n".join(lines).strip() for (heading, _n), lines in split_sections(existing) if heading.startswith("##")]
+    new = [e for e in entries if e not in blocks]
+    if new:
+        blocks = sorted(blocks + new, key=key, reverse=True)
+        _write_text(path, f"# {title}\n\n" + "\n\n".join(blocks) + "\n")
+    return len(new)
+
+
+def _update_archive_index(path, rows):
+    """合併摘要表的資料列 (以 日期+標題 去重)，依日期由新到舊"""
+    table = {}
+    for line in (_read_text(path) or "").splitlines():
+        m = _INDEX_ROW_RE.match(line)
+        if m:
+            table[(m.group(1), m.group(2))] = m.groups()
+    for row in rows:
+        table.setdefault(row[:2], row)
+    lines = [
+        "# Conversation Archive Index",
+        "",
+        "| Date | Title | Project | Status | Archive |",
+        "| :--- | :--- | :--- | :--- | :--- |",
+    ]
+    for date, title, project, status, month in sorted(table.values(), key=lambda r: r[0], reverse=True):
+        lines.append(f"| {date} | {title} | {project} | {status} | [{month}]({month}.md) |")
+    _write_text(path, "\n".join(lines) + "\n")
+
+
+def _index_row(entry):
+    heading = entry.splitlines()[0]
+    date = heading[4:].split("|")[0].strip()[:10]
+    title = heading.split("|", 1)[1].strip().strip('"') if "|" in heading else ""
+    project = _PROJECT_RE.search(entry)
+    status = _STATUS_RE.search(entry)
+    clean = lambda m: m.group(1).strip().replace("|", "/") if m else ""
+    return (date, title.replace("|", "/"), clean(project), clean(status), date[:7])
+
+
+def compact_conversations(local_dir, hot_entries=HOT_CONVERSATIONS, max_bytes=HOT_MAX_BYTES):
+    """CONVERSATIONS.md 只保留最近 hot_entries 筆 (且不超過 max_bytes)，其餘移到月份檔。回傳封存筆數"""
+    path = os.path.join(local_dir, "CONVERSATIONS.md")
+    text = _read_text(path)
+    if text is None:
+        return 0
+    sections = [("\n".join(lines), heading) for (heading, _n), lines in split_sections(text)]
+    entries = [i for i, (_body, heading) in enumerate(sections) if _ENTRY_RE.match(heading)]
+    # 依日期由新到舊決定保留哪些 (同日期以檔案中的順序為準)
+    newest = sorted(entries, key=lambda i: sections[i][1][4:14], reverse=True)
+    size = sum(len(sections[i][0].encode("utf-8")) for i in range(len(sections)) if i not in entries)
+    keep = set()
+    for i in newest:
+        size += len(sections[i][0].encode("utf-8"))
+        if keep and (len(keep) >= hot_entries or size > max_bytes):
+            break
+        keep.add(i)
+    archived = [i for i in entries if i not in keep]
+    if not archived:
+        return 0
+
+    archive_dir = os.path.join(local_dir, ARCHIVE_DIR, "conversations")
+    by_month = {}
+    for i in archived:
+        by_month.setdefault(_ENTRY_RE.match(sections[i][1]).group(1), []).append(sections[i][0].strip())
+    for month, blocks in sorted(by_month.items()):
+        _add_to_shard(
+            os.path.join(archive_dir, f"{month}.md"),
+            f"Conversation Archive ({month})",
+            blocks,
+            key=lambda block: block[4:14],
+        )
+    _update_archive_index(os.path.join(archive_dir, "INDEX.md"), [_index_row(b) for bs in by_month.values() for b in bs])
+
+    hot = "\n".join(body for i, (body, _heading) in enumerate(sections) if i not in archived)
+    _write_text(path, hot.rstrip("\r\n") + "\n")
+    return len(archived)
+
+
+def compact_short_term(local_dir):
+    """
+    把 SHORT_TERM.md 中已完成 (- [x]) 的頂層任務連同其子項目移到本月的封存檔。回傳移動數量。
+    只移動頂層任務，且子項目都已完成時才移動：已完成的子任務留在未完成的上層任務下，清單結構不變。
+    """
+    path = os.path.join(local_dir, "SHORT_TERM.md")
+    text = _read_text(path)
+    if text is None:
+        return 0
+    lines = text.split("\n")
+    done, keep, i = [], [], 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.lower().startswith("- [x]"):
+            keep.append(line)
+            i += 1
+            continue
+        block = [line]
+        i += 1
+        while i < len(lines) and lines[i].strip() and lines[i][0] in " \t":
+            block.append(lines[i])
+            i += 1
+        if any(child.lstrip().startswith("- [ ]") for child in block[1:]):
+            keep.extend(block)
+        else:
+            done.append("\n".join(block).rstrip())
+    if not done:
+        return 0
+
+    today = time.strftime("%Y-%m-%d")
+    shard = os.path.join(local_dir, ARCHIVE_DIR, "short_term", f"{today[:7]}.md")
+    existing = _read_text(shard) or ""
+    new = [d for d in done if d not in existing]
+    if new:
+        _add_to_shard(shard, f"Completed Tasks ({today[:7]})", [f"## {today}\n" + "\n".join(new)], key=lambda block: block[3:13])
+    _write_text(path, "\n".join(keep))
+    return len(done)
+
+
+@timed("memory.compact")
+def compact_memory(local_dir="memory", hot_entries=HOT_CONVERSATIONS, max_bytes=HOT_MAX_BYTES):
+    """壓縮熱檔案；沒有東西可壓縮時不會寫任何檔案。回傳 {"conversations": n, "short_term": n}"""
+    stats = {
+        "conversations": compact_conversations(local_dir, hot_entries, max_bytes),
+        "short_term": compact_short_term(local_dir),
+    }
+    if stats["conversations"]:
+        print(f"🗄️ Archived {stats['conversations']} conversation entries to memory/{ARCHIVE_DIR}/conversations/")
+    if stats["short_term"]:
+        print(f"🗄️ Archived {stats['short_term']} completed tasks to memory/{ARCHIVE_DIR}/short_term/")
+    for name in ("SHORT_TERM.md", "CONVERSATIONS.md"):
+        path = os.path.join(local_dir, name)
+        if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+            print(f"⚠️ {name} is still larger than {max_bytes // 1024} KB; consider moving content to LONG_TERM.md")
+    return stats
+
+
+# --- Search Index ---
+# memory/.search_index.json (隱藏檔，不會被同步):
+#   files:  {rel: {mtime, size, sha, chunks: [chunk id]}}
+#   chunks: {id: {file, heading, hash, tags, terms: {term: tf}, text}}
+#   terms:  {term: [chunk id]}  (inverted index)
+# chunk 以章節為單位，id 由檔名與內容 hash 組成；內容沒變的 chunk 直接沿用。
+
+def tokenize(text):
+    """英數字詞轉小寫；中日韓文字切成 bigram"""
+    tokens = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        if word[0] >= "\u3400":
+            tokens.extend(word[i:i + 2] for i in range(max(len(word) - 1, 1)))
+        elif len(word) > 1:
+            tokens.append(word)
+    return tokens
+
+
+def chunk_tags(rel_path, text):
+    """找出 chunk 相關的專案 (CONVERSATIONS 的 **Project** 欄位、projects/<Name> 路徑)"""
+    tags = {m.strip().strip("*`").strip() for m in _PROJECT_RE.findall(text)}
+    tags.update(_PROJECT_PATH_RE.findall(f"{rel_path}\n{text}"))
+    return sorted(t for t in tags if t)
+
+
+_INDEX_CACHE = {}  # 同一個 process 內重複搜尋時不重新讀取索引檔: {path: (mtime, index)}
+
+
+def load_index(local_dir):
+    path = os.path.join(local_dir, INDEX_NAME)
+    try:
+        mtime = os.stat(path).st_mtime
+        cached = _INDEX_CACHE.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            _INDEX_CACHE[path] = (mtime, index)
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "files": {}, "chunks": {}, "terms": {}}
+
+
+def save_index(local_dir, index):
+    path = os.path.join(local_dir, INDEX_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+    _INDEX_CACHE[path] = (os.stat(path).st_mtime, index)
+
+
+def _drop_chunk(index, chunk_id):
+    chunk = index["chunks"].pop(chunk_id)
+    for term in chunk["terms"]:
+        postings = index["terms"].get(term, [])
+        if chunk_id in postings:
+            postings.remove(chunk_id)
+        if not postings:
+            index["terms"].pop(term, None)
+
+
+def _add_chunk(index, chunk_id, chunk):
+    index["chunks"][chunk_id] = chunk
+    for term in chunk["terms"]:
+        index["terms"].setdefault(term, []).append(chunk_id)
+
+
+def update_index(local_dir="memory", include=None, exclude=None):
+    """
+    增量更新搜尋索引，回傳 (index, stats)。
+    mtime/size 沒變的檔案不讀；內容 hash 沒變的章節不重建。
+    """
+    include = include or ["*.md"]
+    exclude = DEFAULT_EXCLUDE + (exclude or [])
+    index = load_index(local_dir)
+    stats = {"files": 0, "reindexed": 0, "kept": 0, "removed": 0}
+    seen = set()
+    dirty = False
+
+    for root, dirs, names in os.walk(local_dir):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            if not is_selected(rel_path, include, exclude):
+                continue
+            seen.add(rel_path)
+            stats["files"] += 1
+            st = os.stat(path)
+            entry = index["files"].get(rel_path)
+            if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+                stats["kept"] += len(entry["chunks"])
+                continue
+
+            with open(path, "rb") as f:
+                data = f.read()
+            sha = blob_sha(data)
+            old_chunks = set(entry["chunks"]) if entry else set()
+            dirty = True
+            if entry and entry["sha"] == sha:
+                entry.update(mtime=st.st_mtime, size=st.st_size)
+                stats["kept"] += len(old_chunks)
+                continue
+
+            chunk_ids = []
+            for (heading, _n), lines in split_sections(data.decode("utf-8", errors="replace")):
+                text = "\n".join(lines).strip()
+                if not text:
+                    continue
+                digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+                chunk_id = f"{rel_path}@{digest}"
+                if chunk_id in chunk_ids:
+                    continue
+                chunk_ids.append(chunk_id)
+                if chunk_id in old_chunks:
+                    stats["kept"] += 1
+                    continue
+                terms = {}
+                for term in tokenize(text):
+                    terms[term] = terms.get(term, 0) + 1
+                _add_chunk(index, chunk_id, {
+                    "file": rel_path,
+                    "heading": heading.lstrip("#").strip(),
+                    "hash": digest,
+                    "tags": chunk_tags(rel_path, text),
+                    "terms": terms,
+                    "text": text,
+                })
+                stats["reindexed"] += 1
+            for chunk_id in old_chunks - set(chunk_ids):
+                _drop_chunk(index, chunk_id)
+                stats["removed"] += 1
+            index["files"][rel_path] = {"mtime": st.st_mtime, "size": st.st_size, "sha": sha, "chunks": chunk_ids}
+
+    for rel_path in set(index["files"]) - seen:
+        dirty = True
+        for chunk_id in index["files"].pop(rel_path)["chunks"]:
+            _drop_chunk(index, chunk_id)
+            stats["removed"] += 1
+
+    if dirty or not os.path.exists(os.path.join(local_dir, INDEX_NAME)):
+        save_index(local_dir, index)
+    return index, stats
+
+
+@timed("memory.search")
+def search(query, local_dir="memory", project=None, files=None, limit=SEARCH_LIMIT):
+    """
+    搜尋記憶，回傳最相關的章節列表 (依分數排序)：
+    [{"file", "heading", "tags", "score", "text"}]
+    project: 只回傳標記為該專案的章節 (不分大小寫)
+    files:   glob 列表，只搜尋符合的檔案 (例如 ["LONG_TERM.md"])
+    沒有關鍵字時依 project/files 篩選，回傳檔案中的前 limit 個章節。
+    """
+    index, _stats = update_index(local_dir)
+    chunks = index["chunks"]
+    total = max(len(chunks), 1)
+
+    def wanted(chunk):
+        if project and project.lower() not in (t.lower() for t in chunk["tags"]):
+            return False
+        return not files or any(fnmatch.fnmatch(chunk["file"], p) for p in files)
+
+    terms = list(dict.fromkeys(tokenize(query or "")))
+    scores = {}
+    if terms:
+        for term in terms:
+            postings = index["terms"].get(term, [])
+            idf = math.log(1 + total / (1 + len(postings)))
+            for chunk_id in postings:
+                chunk = chunks[chunk_id]
+                if not wanted(chunk):
+                    continue
+                tf = chunk["terms"][term]
+                hits, score = scores.get(chunk_id, (0, 0.0))
+                scores[chunk_id] = (hits + 1, score + idf * tf / (tf + 1.2))
+    else:
+        ordered = [cid for entry in index["files"].values() for cid in entry["chunks"]]
+        scores = {cid: (0, 0.0) for cid in ordered if wanted(chunks[cid])}
+
+    # 命中較多關鍵字者優先，再比 tf-idf 分數
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True) if terms else list(scores.items())
+    return [
+        {
+            "file": chunks[cid]["file"],
+            "heading": chunks[cid]["heading"],
+            "tags": chunks[cid]["tags"],
+            "score": round(score, 3),
+            "text": chunks[cid]["text"],
+        }
+        for cid, (_hits, score) in ranked[:limit]
+    ]
+
+
+def print_results(results, elapsed):
+    if not results:
+        print(f"ℹ️ No matching memory ({elapsed * 1000:.1f} ms)")
+        return
+    print(f"🔍 {len(results)} section(s) ({elapsed * 1000:.1f} ms)\n")
+    for r in results:
+        tags = f"  [{', '.join(r['tags'])}]" if r["tags"] else ""
+        print(f"📄 {r['file']} › {r['heading'] or '(top)'}{tags}")
+        print(r["text"])
+        print()
+
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python memory_client.py [pull|push]")
+    parser = argparse.ArgumentParser(description="Sync memory/ with PRIVATE_DATA_REPO, or search it locally")
+    parser.add_argument("action", choices=["pull", "push", "search", "index", "compact"])
+    parser.add_argument("query", nargs="*", help="search 的關鍵字")
+    parser.add_argument("--include", action="append", metavar="GLOB", help="只同步/搜尋符合的檔案 (可重複)")
+    parser.add_argument("--exclude", action="append", metavar="GLOB", help="排除符合的檔案 (可重複)")
+    parser.add_argument("--project", help="search: 只回傳此專案的章節")
+    parser.add_argument("--limit", type=int, default=SEARCH_LIMIT, help="search: 最多回傳幾個章節")
+    parser.add_argument("--json", action="store_true", help="search: 以 JSON 輸出")
+    parser.add_argument("--keep", type=int, default=HOT_CONVERSATIONS, help="compact: CONVERSATIONS.md 保留幾筆")
+    parser.add_argument("--max-bytes", type=int, default=HOT_MAX_BYTES, help="compact: 熱檔案大小上限")
+    parser.add_argument("--compact", action="store_true", help="push: 上傳前先壓縮熱檔案 (同 compact)")
+    args = parser.parse_args()
+    if args.action == "search":
+        start = time.perf_counter()
+        results = search(" ".join(args.query), project=args.project, files=args.include, limit=args.limit)
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        else:
+            print_results(results, time.perf_counter() - start)
+    elif args.action == "compact":
+        stats = compact_memory(hot_entries=args.keep, max_bytes=args.max_bytes)
+        if not any(stats.values()):
+            print("⏹️ Nothing to compact")
+    elif args.action == "index":
+        _index, stats = update_index(include=args.include, exclude=args.exclude)
+        print(f"✅ Indexed {stats['files']} files: {stats['reindexed']} sections rebuilt, "
+              f"{stats['kept']} unchanged, {stats['removed']} removed")
     else:
-        sync_memory(sys.argv[1])
+        sync_memory(args.action, args.include, args.exclude, compact=args.compact)
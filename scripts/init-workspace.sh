@@ -5,6 +5,7 @@
 # 使用方法：
 #   bash init-workspace.sh
 #   bash init-workspace.sh --name "MyWorkspace"
+#   bash init-workspace.sh --shared     # 由整台機器共用的 skills 快取建立 (git worktree)
 
 set -e  # 遇到錯誤立即退出
 
@@ -20,6 +21,8 @@ NC='\033[0m' # No Color
 SKILLS_REPO="https://github.com/alstonhuang/shared-agent-skills.git"
 WORKSPACE_NAME=""
 WORKSPACE_ROOT=$(pwd)
+SHARED=0
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 # 列印函數
 print_header() {
@@ -55,16 +58,22 @@ while [[ $# -gt 0 ]]; do
             SKILLS_REPO="$2"
             shift 2
             ;;
+        --shared)
+            SHARED=1
+            shift
+            ;;
         --help)
             echo "用法: bash init-workspace.sh [選項]"
             echo ""
             echo "選項:"
             echo "  --name NAME    指定 workspace 名稱"
             echo "  --repo URL     指定 skills Git 倉庫 URL"
+            echo "  --shared       使用整台機器共用的 skills 快取 (git worktree，不重複下載)"
             echo "  --help         顯示此說明"
             echo ""
             echo "範例:"
             echo "  bash init-workspace.sh --name \"MyWorkspace\""
+            echo "  bash init-workspace.sh --shared"
             exit 0
             ;;
         *)
@@ -101,7 +110,18 @@ print_success "目錄結構已創建"
 # 3. 安裝 Skills
 print_info "安裝 Shared Skills..."
 
-if [ -d ".agent/skills" ]; then
+if [ "$SHARED" = "1" ]; then
+    # 共用快取的建立、fetch 與 worktree 管理都交給 install.py，兩個腳本的行為保持一致
+    PYTHON=$(command -v python3 || command -v python || true)
+    if [ -z "$PYTHON" ] || [ ! -f "$SCRIPT_DIR/install.py" ]; then
+        print_error "--shared 需要 Python 與 $SCRIPT_DIR/install.py"
+        exit 1
+    fi
+    if ! "$PYTHON" "$SCRIPT_DIR/install.py" --from-git --shared --repo "$SKILLS_REPO" --target "$WORKSPACE_ROOT/.agent/skills"; then
+        print_error "Skills 安裝失敗"
+        exit 1
+    fi
+elif [ -d ".agent/skills" ]; then
     if [ -d ".agent/skills/.git" ]; then
         print_warning "Skills 已存在，執行更新..."
         cd .agent/skills
@@ -262,8 +282,12 @@ echo ""
 
 # 提示如何更新 skills
 print_info "更新 skills 的方法："
-echo "  cd .agent/skills"
-echo "  git pull"
+if [ "$SHARED" = "1" ]; then
+    echo "  python .agent/skills/scripts/install.py --shared --update-all   # 所有共用快取的 workspace 一起更新"
+else
+    echo "  cd .agent/skills"
+    echo "  git pull"
+fi
 echo ""
 
 # 如果指定了 workspace 名稱，提示註冊
@@ -7,10 +7,19 @@ Skills 安裝腳本（跨平台）
     python install.py
     python install.py --from-git
     python install.py --source /path/to/local/skills
+    python install.py --source /path/to/local/skills --link    # 以 hardlink 安裝
+    python install.py --from-git --shared                      # 由整台機器共用的快取建立 (git worktree)
+    python install.py --shared --update-all                    # fetch 共用快取，更新所有由它建立的 workspace
+
+從本地安裝時預設為增量模式：依上次安裝寫下的 manifest 比對內容 hash，
+只複製有變動的檔案、移除來源已刪除的檔案，並只備份被覆蓋或移除的檔案。
 """
 
 import os
 import sys
+import json
+import time
+import hashlib
 import argparse
 import shutil
 import subprocess
@@ -18,6 +27,22 @@ import platform
 from pathlib import Path
 from datetime import datetime
 
+DEFAULT_REPO = "https://github.com/alstonhuang/shared-agent-skills.git"
+
+# 增量安裝的 manifest (放在目標目錄中)
+MANIFEST_NAME = ".skills-manifest.json"
+MANIFEST_VERSION = 1
+
+# 不安裝的目錄與檔案
+IGNORE_DIRS = {".git", ".agent", "__pycache__"}
+IGNORE_SUFFIXES = (".pyc",)
+
+# --shared：整台機器共用的 skills 快取 (bare repo)，每個 workspace 是它的一個 git worktree
+# 位置與 common/skill_loader.py 的快取相同 (AGENT_SKILLS_CACHE)
+SHARED_CACHE_DIR = Path(os.environ.get("AGENT_SKILLS_CACHE") or Path.home() / ".cache" / "agent-skills") / "repos"
+# 快取在這段時間 (秒) 內 fetch 過時，建立 workspace 不再連網
+SHARED_FETCH_TTL = 600
+
 
 class Colors:
     """跨平台的顏色輸出"""
@@ -84,6 +109,19 @@ def check_git_installed():
     return success
 
 
+def new_backup_path(target_path):
+    """
+    回傳尚未存在的備份路徑 <target>.backup.<時間>；
+    同一秒內重複執行時加上 -2、-3 ...，不會覆蓋先前的備份
+    """
+    base = f"{target_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    path, n = Path(base), 1
+    while path.exists():
+        n += 1
+        path = Path(f"{base}-{n}")
+    return path
+
+
 def install_from_git(target_path, repo_url):
     """從 Git 倉庫安裝 skills"""
     print_info(f"從 Git 倉庫安裝: {repo_url}")
@@ -107,7 +145,7 @@ def install_from_git(target_path, repo_url):
                 return False
             
             # 備份
-            backup_path = f"{target_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            backup_path = new_backup_path(target_path)
             print_info(f"備份到: {backup_path}")
             shutil.move(str(target_path), backup_path)
     
@@ -123,13 +161,175 @@ def install_from_git(target_path, repo_url):
         return False
 
 
-def install_from_local(source_path, target_path):
-    """從本地路徑複製 skills"""
+def shared_cache_path(repo_url):
+    """<repo 名稱>-<URL 的短 hash>.git：同名的 fork 各自使用自己的快取"""
+    url = repo_url.rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    name = url.rsplit("/", 1)[-1]
+    return SHARED_CACHE_DIR / f"{name}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}.git"
+
+
+def ensure_shared_cache(repo_url, max_age=SHARED_FETCH_TTL):
+    """
+    建立或更新共用快取，回傳 (快取路徑, 預設分支)。
+    快取不存在時 bare clone 一次；存在且 max_age 秒內 fetch 過時不連網。
+    """
+    cache = shared_cache_path(repo_url)
+    if not cache.exists():
+        print_info(f"建立共用快取: {cache}")
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_name(f"{cache.name}.tmp.{os.getpid()}")
+        for cmd in (["git", "clone", "--bare", "--quiet", repo_url, str(tmp)],
+                    ["git", "-C", str(tmp), "config", "remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*"],
+                    ["git", "-C", str(tmp), "fetch", "--quiet", "origin"]):
+            success, _, stderr = run_command(cmd)
+            if not success:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise RuntimeError(stderr.strip())
+        try:
+            os.rename(tmp, cache)
+        except OSError:
+            # 其他 workspace 同時建立了快取
+            shutil.rmtree(tmp, ignore_errors=True)
+    else:
+        fetch_head = cache / "FETCH_HEAD"
+        if not fetch_head.exists() or time.time() - fetch_head.stat().st_mtime > max_age:
+            print_info("更新共用快取 (git fetch)...")
+            success, _, stderr = run_command(["git", "-C", str(cache), "fetch", "--quiet", "--prune", "origin"])
+            if not success:
+                print_warning(f"fetch 失敗，使用目前的快取: {stderr.strip()}")
+    _, branch, _ = run_command(["git", "-C", str(cache), "symbolic-ref", "--short", "HEAD"])
+    return cache, branch.strip() or "main"
+
+
+def _is_worktree_of(path, cache):
+    success, common_dir, _ = run_command(["git", "-C", str(path), "rev-parse", "--git-common-dir"])
+    # 相對路徑是相對於 path
+    return success and (Path(path) / common_dir.strip()).resolve() == cache.resolve()
+
+
+def _update_worktree(path, branch):
+    """把 worktree 移到 origin/<branch>；有未提交的變更時跳過。回傳結果字串"""
+    success, dirty, _ = run_command(["git", "-C", str(path), "status", "--porcelain", "--untracked-files=no"])
+    if success and dirty.strip():
+        return "dirty"
+    _, before, _ = run_command(["git", "-C", str(path), "rev-parse", "HEAD"])
+    success, _, stderr = run_command(["git", "-C", str(path), "checkout", "--quiet", "--detach", f"origin/{branch}"])
+    if not success:
+        return f"error: {stderr.strip()}"
+    _, after, _ = run_command(["git", "-C", str(path), "rev-parse", "HEAD"])
+    return "unchanged" if before == after else "updated"
+
+
+def install_shared(target_path, repo_url):
+    """
+    以共用快取安裝：target_path 是快取的 git worktree (不複製 objects，建立幾乎是瞬間完成)。
+    已經是該快取的 worktree 時更新到 origin 最新版本。
+    """
+    try:
+        cache, branch = ensure_shared_cache(repo_url)
+    except RuntimeError as e:
+        print_error(f"建立共用快取失敗: {e}")
+        return False
+
+    if target_path.exists():
+        if _is_worktree_of(target_path, cache):
+            result = _update_worktree(target_path, branch)
+            if result in ("updated", "unchanged"):
+                print_success(f"Skills 已是共用快取的最新版本 ({result})")
+                return True
+            print_error(f"更新失敗: {result}")
+            return False
+        print_warning(f"目標路徑已存在: {target_path}")
+        response = input("是否要備份並改用共用快取？(y/N): ").strip().lower()
+        if response != 'y':
+            print_error("安裝已取消")
+            return False
+        backup_path = new_backup_path(target_path)
+        print_info(f"備份到: {backup_path}")
+        shutil.move(str(target_path), backup_path)
+
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    success, _, stderr = run_command(["git", "-C", str(cache), "worktree", "add", "--quiet", "--detach",
+                                      str(target_path.resolve()), f"origin/{branch}"])
+    if not success:
+        print_error(f"建立 worktree 失敗: {stderr.strip()}")
+        return False
+    print_success(f"Skills 已由共用快取建立 ({cache})")
+    return True
+
+
+def update_shared_workspaces(repo_url=None):
+    """
+    fetch 共用快取一次，再把所有 workspace (worktree) 更新到最新版本。
+    沒有指定 repo_url 時更新 SHARED_CACHE_DIR 中的每個快取，各自使用快取本身記錄的 remote URL
+    (以自訂 --repo 建立的 workspace 也不需要再指定 --repo)。
+    """
+    if repo_url:
+        repo_urls = [repo_url]
+    else:
+        repo_urls = []
+        for cache in sorted(SHARED_CACHE_DIR.glob("*.git")):
+            success, url, _ = run_command(["git", "-C", str(cache), "config", "--get", "remote.origin.url"])
+            if success and url.strip():
+                repo_urls.append(url.strip())
+        if not repo_urls:
+            print_warning(f"沒有共用快取: {SHARED_CACHE_DIR}")
+            return True
+    ok = True
+    for url in repo_urls:
+        print_info(f"共用快取: {url}")
+        ok = _update_cache_workspaces(url) and ok
+    return ok
+
+
+def _update_cache_workspaces(repo_url):
+    """update_shared_workspaces() 的單一快取部分"""
+    try:
+        cache, branch = ensure_shared_cache(repo_url, max_age=0)
+    except RuntimeError as e:
+        print_error(f"更新共用快取失敗: {e}")
+        return False
+    # 清除已被刪除的 workspace
+    run_command(["git", "-C", str(cache), "worktree", "prune"])
+    _, listing, _ = run_command(["git", "-C", str(cache), "worktree", "list", "--porcelain"])
+    worktrees = [Path(line[len("worktree "):]) for line in listing.splitlines() if line.startswith("worktree ")]
+    ok = True
+    for path in worktrees:
+        if path.resolve() == cache.resolve():
+            continue
+        result = _update_worktree(path, branch)
+        if result in ("updated", "unchanged"):
+            print_success(f"{path}: {result}")
+        elif result == "dirty":
+            print_warning(f"{path}: 有未提交的變更，跳過")
+        else:
+            ok = False
+            print_error(f"{path}: {result}")
+    return ok
+
+
+def install_from_local(source_path, target_path, full=False, link=False, backup=True, dry_run=False):
+    """
+    從本地路徑安裝 skills。
+    預設為增量模式 (見 install_incremental)，不需要確認；full=True 時使用舊的方式：
+    整個目錄備份後重新複製 (會詢問是否覆蓋)。
+    """
     print_info(f"從本地複製: {source_path}")
     
     if not source_path.exists():
         print_error(f"來源路徑不存在: {source_path}")
         return False
+
+    if not full:
+        try:
+            stats = install_incremental(source_path, target_path, link=link, backup=backup, dry_run=dry_run)
+        except Exception as e:
+            print_error(f"安裝失敗: {e}")
+            return False
+        print_install_stats(stats, dry_run)
+        return True
     
     if target_path.exists():
         print_warning(f"目標路徑已存在: {target_path}")
@@ -139,7 +339,7 @@ def install_from_local(source_path, target_path):
             return False
         
         # 備份
-        backup_path = f"{target_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        backup_path = new_backup_path(target_path)
         print_info(f"備份到: {backup_path}")
         shutil.move(str(target_path), backup_path)
     
@@ -153,6 +353,158 @@ def install_from_local(source_path, target_path):
         return False
 
 
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(target_path):
+    try:
+        with open(target_path / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def save_manifest(target_path, manifest):
+    path = target_path / MANIFEST_NAME
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def scan_source(source_path):
+    """列出來源中要安裝的檔案：{相對路徑 (以 / 分隔): os.stat_result}"""
+    files = {}
+    for root, dirs, names in os.walk(source_path):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORE_DIRS and not d.startswith(".backup"))
+        for name in names:
+            if name.endswith(IGNORE_SUFFIXES) or name == MANIFEST_NAME:
+                continue
+            path = os.path.join(root, name)
+            files[os.path.relpath(path, source_path).replace(os.sep, "/")] = os.stat(path)
+    return files
+
+
+def _stat_key(st):
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _place(src, dst, link):
+    """以 hardlink (link=True，跨檔案系統時退回複製) 或複製的方式把 src 放到 dst (原子替換)"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.installing")
+    if tmp.exists():
+        tmp.unlink()
+    if link:
+        try:
+            os.link(src, tmp)
+            os.replace(tmp, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def install_incremental(source_path, target_path, link=False, backup=True, dry_run=False):
+    """
+    增量安裝：以 manifest 記錄的 hash 比對來源與目標，只處理有差異的檔案。
+    - 來源與目標的 mtime/size 都和 manifest 相同時不重新計算 hash
+    - 內容不同的檔案才複製 (或 hardlink)；來源已刪除、且由上次安裝建立的檔案會被移除
+    - 被覆蓋或移除的檔案先備份到 <target>.backup.<時間>/ (只在需要時建立)
+    - 目標中不在 manifest 的檔案 (使用者自己加的) 不會被動到
+    回傳統計 {"added", "updated", "removed", "unchanged", "backup"}
+    """
+    started = time.monotonic()
+    manifest = load_manifest(target_path)
+    previous = manifest["files"]
+    source_files = scan_source(source_path)
+    stats = {"added": [], "updated": [], "removed": [], "unchanged": 0, "backup": None}
+    backup_root = None
+
+    def back_up(dst, rel):
+        nonlocal backup_root
+        if not backup or dry_run:
+            return
+        if backup_root is None:
+            backup_root = new_backup_path(target_path)
+            # exist_ok=False：絕不寫進既有的備份目錄 (同時執行的另一個安裝已使用這個名稱時直接失敗)
+            backup_root.mkdir(parents=True)
+        dest = backup_root / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(dst, dest)
+        stats["backup"] = str(backup_root)
+
+    files = {}
+    for rel, src_stat in source_files.items():
+        src, dst = source_path / rel, target_path / rel
+        entry = previous.get(rel, {})
+        sha = entry["sha256"] if entry.get("source_stat") == _stat_key(src_stat) else file_sha256(src)
+
+        try:
+            dst_stat = os.stat(dst)
+        except FileNotFoundError:
+            dst_stat = None
+        if dst_stat is not None:
+            # 目標自上次安裝後沒被動過時，沿用 manifest 中的 hash
+            dst_sha = entry["sha256"] if entry.get("target_stat") == _stat_key(dst_stat) else file_sha256(dst)
+            if dst_sha == sha:
+                stats["unchanged"] += 1
+                files[rel] = {"sha256": sha, "source_stat": _stat_key(src_stat), "target_stat": _stat_key(dst_stat)}
+                continue
+            back_up(dst, rel)
+            stats["updated"].append(rel)
+        else:
+            stats["added"].append(rel)
+
+        if not dry_run:
+            _place(src, dst, link)
+            files[rel] = {"sha256": sha, "source_stat": _stat_key(src_stat), "target_stat": _stat_key(os.stat(dst))}
+
+    for rel in sorted(set(previous) - set(source_files)):
+        dst = target_path / rel
+        if not dst.exists():
+            continue
+        stats["removed"].append(rel)
+        if dry_run:
+            continue
+        back_up(dst, rel)
+        dst.unlink()
+        # 移除因此變空的目錄
+        parent = dst.parent
+        while parent != target_path and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+    if not dry_run:
+        manifest.update(source=str(source_path), installed=datetime.now().isoformat(timespec="seconds"), files=files)
+        save_manifest(target_path, manifest)
+    stats["elapsed"] = time.monotonic() - started
+    return stats
+
+
+def print_install_stats(stats, dry_run=False):
+    prefix = "[dry-run] " if dry_run else ""
+    for rel in stats["added"]:
+        print(f"  + {rel}")
+    for rel in stats["updated"]:
+        print(f"  ~ {rel}")
+    for rel in stats["removed"]:
+        print(f"  - {rel}")
+    print_success(f"{prefix}{len(stats['added'])} 新增, {len(stats['updated'])} 更新, {len(stats['removed'])} 移除, "
+                  f"{stats['unchanged']} 未變動 ({stats['elapsed'] * 1000:.0f} ms)")
+    if stats["backup"]:
+        print_info(f"被覆蓋/移除的檔案已備份到: {stats['backup']}")
+
+
 def list_installed_skills(skills_path):
     """列出已安裝的 skills"""
     if not skills_path.exists():
@@ -218,9 +570,16 @@ def main():
   # 從 Git 安裝
   python install.py --from-git
   
-  # 從本地路徑安裝
+  # 多個 workspace 共用同一份快取（git worktree）
+  python install.py --from-git --shared
+  python install.py --shared --update-all
+  
+  # 從本地路徑安裝（增量：只複製有變動的檔案）
   python install.py --source /path/to/skills
   
+  # 以 hardlink 安裝到多個 workspace（同一檔案系統）
+  python install.py --source /path/to/skills --link --target /ws1/.agent/skills
+  
   # 指定目標路徑
   python install.py --from-git --target /custom/path
   
@@ -236,8 +595,7 @@ def main():
     )
     parser.add_argument(
         '--repo',
-        default='https://github.com/alstonhuang/shared-agent-skills.git',
-        help='Git 倉庫 URL（預設：alstonhuang/shared-agent-skills）'
+        help='Git 倉庫 URL（預設：alstonhuang/shared-agent-skills；--update-all 時預設為所有共用快取）'
     )
     parser.add_argument(
         '--source',
@@ -252,6 +610,36 @@ def main():
         action='store_true',
         help='列出已安裝的 skills'
     )
+    parser.add_argument(
+        '--shared',
+        action='store_true',
+        help='與 --from-git 併用：以整台機器共用的快取建立 (git worktree)，不重複下載'
+    )
+    parser.add_argument(
+        '--update-all',
+        action='store_true',
+        help='與 --shared 併用：fetch 共用快取一次，更新所有使用它的 workspace（不需再指定 --repo）'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='本地安裝時整個目錄備份後重新複製（舊的行為，會詢問是否覆蓋）'
+    )
+    parser.add_argument(
+        '--link',
+        action='store_true',
+        help='以 hardlink 取代複製（同一檔案系統；注意：修改安裝後的檔案也會改到來源）'
+    )
+    parser.add_argument(
+        '--no-backup',
+        action='store_true',
+        help='增量安裝時不備份被覆蓋或移除的檔案'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='只列出會變動的檔案，不實際安裝'
+    )
     
     args = parser.parse_args()
     
@@ -276,7 +664,7 @@ def main():
         return 0
     
     # 檢查 Git
-    if args.from_git and not check_git_installed():
+    if (args.from_git or args.update_all) and not check_git_installed():
         print_error("Git 未安裝或不在 PATH 中")
         print_info("請安裝 Git: https://git-scm.com/downloads")
         return 1
@@ -284,24 +672,33 @@ def main():
     # 執行安裝
     success = False
     
-    if args.from_git:
+    if args.update_all:
+        return 0 if update_shared_workspaces(args.repo) else 1
+    repo_url = args.repo or DEFAULT_REPO
+
+    if args.from_git and args.shared:
+        success = install_shared(target_path, repo_url)
+    elif args.from_git:
         # 從 Git 安裝
-        success = install_from_git(target_path, args.repo)
+        success = install_from_git(target_path, repo_url)
     elif args.source:
         # 從本地安裝
         source_path = Path(args.source)
-        success = install_from_local(source_path, target_path)
+        success = install_from_local(source_path, target_path, args.full, args.link, not args.no_backup, args.dry_run)
     else:
         # 預設：嘗試從預設本地路徑複製
         default_source = Path(__file__).parent.parent
         if default_source.exists():
             print_info("使用預設本地來源")
-            success = install_from_local(default_source, target_path)
+            success = install_from_local(default_source, target_path, args.full, args.link, not args.no_backup, args.dry_run)
         else:
             print_error("請指定 --from-git 或 --source")
             parser.print_help()
             return 1
     
+    if success and args.dry_run:
+        return 0
+
     if success:
         # 列出已安裝的 skills
         list_installed_skills(target_path)
@@ -314,7 +711,11 @@ def main():
         print("  2. 查看 SKILL.md 了解每個 skill 的使用方法")
         print()
         
-        if args.from_git:
+        if args.from_git and args.shared:
+            print_info("更新 skills 的方法（所有 workspace 一起更新）：")
+            print(f"  python {target_path / 'scripts' / 'install.py'} --shared --update-all")
+            print()
+        elif args.from_git:
             print_info("更新 skills 的方法：")
             print(f"  cd {target_path}")
             print("  git pull")
@@ -1,6 +1,93 @@
 import os
 import re
+import sys
+import json
+import argparse
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+_SKILL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 跨次執行的解析快取 (相對於 workspace root)；依 mtime + size 判斷 TASKS.md 是否需要重新解析
+CACHE_PATH = os.path.join(".agent", "task_progress.json")
+CACHE_VERSION = 1
+
+# 回報到 Dashboard 的狀態格式
+PROGRESS_STATUS = "🚧 {progress}% ({done}/{total})"
+DONE_STATUS = "✅ {progress}% ({done}/{total})"
+
+_TASK_RE = re.compile(r'^\s*[-*+] \[([ xX])\]')
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+
+# 同一個 process 內的解析結果：abs path -> (mtime_ns, size, result)
+_PARSE_CACHE = {}
+_cache_lock = threading.Lock()
+
+
+def parse_tasks(content):
+    """
+    依標題層級統計 TASKS.md 的 checkbox：
+        {"title": None, "level": 0, "done": 7, "total": 12, "sections": [
+            {"title": "Phase 1", "level": 2, "done": 5, "total": 5, "sections": [...]}, ...]}
+    每個 section 的 done/total 含子 section；縮排的子任務也算一筆。``` 區塊內的內容不計。
+    """
+    root = {"title": None, "level": 0, "done": 0, "total": 0, "sections": []}
+    stack = [root]
+    in_fence = False
+    for line in content.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        heading = _HEADING_RE.match(line)
+        if heading:
+            level = len(heading.group(1))
+            while stack[-1]["level"] >= level:
+                stack.pop()
+            node = {"title": heading.group(2), "level": level, "done": 0, "total": 0, "sections": []}
+            stack[-1]["sections"].append(node)
+            stack.append(node)
+            continue
+        task = _TASK_RE.match(line)
+        if task:
+            for node in stack:
+                node["total"] += 1
+                if task.group(1) in "xX":
+                    node["done"] += 1
+    _prune(root)
+    return root
+
+
+def _prune(node):
+    """移除沒有任何任務的 section (例如說明段落)"""
+    node["sections"] = [s for s in node["sections"] if s["total"]]
+    for s in node["sections"]:
+        _prune(s)
+
+
+def percent(node):
+    return int((node["done"] / node["total"]) * 100) if node["total"] else 0
+
+
+def load_tasks(path):
+    """解析 path (有快取；檔案的 mtime 與 size 都沒變時不重新讀取)，檔案不存在時回傳 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = os.path.abspath(path)
+    with _cache_lock:
+        cached = _PARSE_CACHE.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    with open(path, "r", encoding="utf-8") as f:
+        result = parse_tasks(f.read())
+    with _cache_lock:
+        _PARSE_CACHE[key] = (st.st_mtime_ns, st.st_size, result)
+    return result
+
 
 class TaskArchitect:
     def __init__(self, project_path):
@@ -9,9 +96,144 @@ class TaskArchitect:
         self.tasks_path = os.path.join(project_path, "TASKS.md")
 
     def get_progress(self):
-        if not os.path.exists(self.tasks_path): return 0
-        with open(self.tasks_path, "r", encoding="utf-8") as f: content = f.read()
-        tasks = re.findall(r'- \[([ xX])\]', content)
+        tasks = load_tasks(self.tasks_path)
         if not tasks: return 0
-        done = sum(1 for t in tasks if t.strip().lower() == 'x')
-        return int((done / len(tasks)) * 100)
+        return percent(tasks)
+
+    def get_breakdown(self):
+        """回傳 parse_tasks() 的結果 (含各 section 的統計)，沒有 TASKS.md 時回傳 None"""
+        return load_tasks(self.tasks_path)
+
+
+def _load_disk_cache(root):
+    path = os.path.join(root, CACHE_PATH)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": CACHE_VERSION, "files": {}, "published": {}}
+
+
+def _save_disk_cache(root, data):
+    path = os.path.join(root, CACHE_PATH)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"⚠️ Could not write {path}: {e}")
+
+
+def portfolio_progress(workspace_root=".", max_workers=8):
+    """
+    統計 workspace_root/projects/ 下每個專案的 TASKS.md (平行解析)：
+        {"Beauty-PK": {"progress": 58, "done": 7, "total": 12, "sections": [...]}, ...}
+    沒有 TASKS.md 的專案不列出。解析結果依 mtime + size 快取在 CACHE_PATH，
+    重複呼叫時只重新解析有變動的檔案。
+    """
+    projects_dir = os.path.join(workspace_root, "projects")
+    if not os.path.isdir(projects_dir):
+        return {}
+    names = sorted(n for n in os.listdir(projects_dir) if os.path.isfile(os.path.join(projects_dir, n, "TASKS.md")))
+
+    disk = _load_disk_cache(workspace_root)
+    files = disk["files"]
+
+    def load(name):
+        path = os.path.join(projects_dir, name, "TASKS.md")
+        st = os.stat(path)
+        cached = files.get(name)
+        if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            return name, cached, False
+        tasks = load_tasks(path)
+        return name, {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "tasks": tasks}, True
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        loaded = list(pool.map(load, names))
+
+    dirty = set(files) != set(names)
+    disk["files"] = {}
+    result = {}
+    for name, entry, parsed in loaded:
+        disk["files"][name] = entry
+        dirty = dirty or parsed
+        tasks = entry["tasks"]
+        result[name] = {"progress": percent(tasks), "done": tasks["done"], "total": tasks["total"],
+                        "sections": tasks["sections"]}
+    if dirty:
+        _save_disk_cache(workspace_root, disk)
+    return result
+
+
+def publish_progress(reporter, portfolio, workspace_root=".", changed_only=True, message=None):
+    """
+    把 portfolio_progress() 的結果以一次 batch 更新到 Dashboard (一個 commit)。
+    changed_only: 只送出與上次發佈不同的專案；全部沒變時不送出。
+    只記錄實際發佈的狀態：送出失敗 (回報進入 spool) 或不在 Dashboard 上的專案下次會重送。
+    回傳發佈的專案數。
+    """
+    disk = _load_disk_cache(workspace_root)
+    published = disk.setdefault("published", {})
+    updates = {}
+    for name, p in sorted(portfolio.items()):
+        fmt = DONE_STATUS if p["total"] and p["done"] == p["total"] else PROGRESS_STATUS
+        status = fmt.format(**p)
+        if not changed_only or published.get(name) != status:
+            updates[name] = status
+    if not updates:
+        print("ℹ️ Progress unchanged, nothing to publish.")
+        return 0
+
+    with reporter.batch(message or f"📈 Progress update: {len(updates)} project(s)") as result:
+        for name, status in updates.items():
+            # type_icon=None：保留 Dashboard 上原本的類型圖示
+            reporter.update_status(name, status, type_icon=None)
+    if result["status"] != "published":
+        print(f"⚠️ Progress not published ({result['status']}), will retry next time.")
+        return 0
+    for name in result["skipped"]:
+        updates.pop(name, None)
+    published.update(updates)
+    _save_disk_cache(workspace_root, disk)
+    return len(updates)
+
+
+def _print_sections(sections, indent=1):
+    for s in sections:
+        print(f"{'  ' * indent}{s['title']}: {percent(s)}% ({s['done']}/{s['total']})")
+        _print_sections(s["sections"], indent + 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Task Architect")
+    sub = parser.add_subparsers(dest="command")
+    progress_parser = sub.add_parser("progress", help="統計 projects/ 下所有專案的 TASKS.md 進度")
+    progress_parser.add_argument("--root", default=".", help="workspace 根目錄 (預設目前目錄)")
+    progress_parser.add_argument("--sections", action="store_true", help="列出每個 section 的進度")
+    progress_parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    progress_parser.add_argument("--publish", action="store_true",
+                                 help="以一個 commit 更新 Dashboard 狀態 (需要 GITHUB_TOKEN 與 PRIVATE_DATA_REPO)")
+    progress_parser.add_argument("--all", action="store_true", help="與 --publish 併用：沒有變動的專案也送出")
+    args = parser.parse_args()
+
+    if args.command == "progress":
+        portfolio = portfolio_progress(args.root)
+        if args.json:
+            print(json.dumps(portfolio, ensure_ascii=False, indent=2))
+        else:
+            for name, p in portfolio.items():
+                print(f"📋 {name}: {p['progress']}% ({p['done']}/{p['total']})")
+                if args.sections:
+                    _print_sections(p["sections"])
+        if args.publish:
+            sys.path.insert(0, os.path.join(os.path.dirname(_SKILL_DIR), "command_center_reporter"))
+            from reporter_client import ProjectReporter
+            reporter = ProjectReporter(os.environ.get("GITHUB_TOKEN"), lazy=True)
+            sent = publish_progress(reporter, portfolio, args.root, changed_only=not args.all)
+            print(f"✅ Published progress for {sent} project(s) at {datetime.now():%Y-%m-%d %H:%M:%S}")
+    else:
+        print(f"📋 Progress: {TaskArchitect('.').get_progress()}%")
@@ -0,0 +1,34 @@
+"""
+測試共用的 fixture：skill client 連到 benchmarks/fake_github.py (本地的 GitHub API 替身)，
+不需要網路與 token。
+"""
+
+import os
+import sys
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _dir in ("common", "command_center_reporter", "dual_layer_memory", "benchmarks"):
+    if os.path.join(_ROOT, _dir) not in sys.path:
+        sys.path.insert(0, os.path.join(_ROOT, _dir))
+
+import github_pool
+from fake_github import FakeGitHub
+
+TOKEN = "test-token"
+OWNER = "tester"
+REPO = f"{OWNER}/command-center"
+
+
+@pytest.fixture
+def fake(monkeypatch, tmp_path):
+    """啟動 fake GitHub，讓 github_pool 的新 client 連到它；在暫存目錄執行 (spool、repo 快取不留在 workspace)"""
+    server = FakeGitHub(owner=OWNER).start()
+    monkeypatch.setitem(github_pool.CLIENT_DEFAULTS, "base_url", server.base_url)
+    monkeypatch.setitem(github_pool.CLIENT_DEFAULTS, "seconds_between_writes", None)
+    monkeypatch.delenv("PRIVATE_DATA_REPO", raising=False)
+    monkeypatch.chdir(tmp_path)
+    yield server
+    server.stop()
+    github_pool.reset(TOKEN)
@@ -0,0 +1,63 @@
+"""dual_layer_memory/memory_client.py：三方合併"""
+
+import pytest
+
+import github_pool
+import memory_client
+from conftest import TOKEN, REPO
+
+BASE = "# Memory\n\n## Projects\n- alpha\n\n## Notes\n- first\n"
+
+
+@pytest.fixture
+def repo(fake):
+    """memory/ 中有 base 與兩個遠端版本的 repo，回傳 (repo handle, {名稱: blob sha})"""
+    fake.create_repo(REPO, {"memory/base.md": BASE})
+    fake.write_files(REPO, {
+        "memory/remote.md": BASE.replace("- first\n", "- first\n- remote note\n"),
+        "memory/rewritten.md": BASE.replace("- first\n", "- rewritten\n"),
+    })
+    tree = fake.head_tree(REPO)
+    shas = {name: tree[f"memory/{name}.md"] for name in ("base", "remote", "rewritten")}
+    return github_pool.get_github(TOKEN).get_repo(REPO), shas
+
+
+def test_merge_keeps_edits_from_both_sides(repo):
+    handle, shas = repo
+    local = BASE.replace("- alpha\n", "- alpha\n- beta\n").encode("utf-8")
+
+    merged, conflicts = memory_client.three_way_merge(handle, "MEMORY.md", local, shas["remote"], shas["base"])
+
+    assert conflicts == []
+    text = merged.decode("utf-8")
+    assert "- beta" in text and "- remote note" in text
+
+
+def test_merge_reports_overlapping_edits(repo):
+    handle, shas = repo
+    local = BASE.replace("- first\n", "- changed locally\n").encode("utf-8")
+
+    merged, conflicts = memory_client.three_way_merge(handle, "MEMORY.md", local, shas["rewritten"], shas["base"])
+
+    assert conflicts
+    assert memory_client.CONFLICT_MARKER in merged
+
+
+def test_merge_without_base_keeps_both_versions(repo):
+    handle, shas = repo
+    local = "# Memory\n\n## Local\n- only here\n".encode("utf-8")
+
+    merged, conflicts = memory_client.three_way_merge(handle, "MEMORY.md", local, shas["base"], None)
+
+    text = merged.decode("utf-8")
+    assert "- only here" in text and "- alpha" in text
+
+
+def test_merge_leaves_binary_files_alone(repo):
+    handle, shas = repo
+    local = b"\x89PNG\r\n\x1a\n\x00\xff"
+
+    merged, conflicts = memory_client.three_way_merge(handle, "image.png", local, shas["remote"], shas["base"])
+
+    assert merged == local
+    assert conflicts == [memory_client.BINARY_CONFLICT]
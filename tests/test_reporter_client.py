@@ -0,0 +1,134 @@
+"""command_center_reporter/reporter_client.py：衝突重試、spool 重送、日誌封存"""
+
+import re
+
+import pytest
+
+import reporter_client
+from conftest import TOKEN, REPO
+
+DASHBOARD = f"""# Dashboard
+
+{reporter_client.PROJECTS_START}
+| Type | Project Name | Link | Status |
+| :---: | :--- | :--- | :--- |
+{reporter_client.PROJECTS_END}
+
+## 📝 Scratchpad
+"""
+
+
+@pytest.fixture
+def repo(fake, monkeypatch):
+    """含空白 Dashboard 的 Command Center repo；衝突重試不等待"""
+    monkeypatch.setattr(reporter_client, "CONFLICT_BACKOFF", 0)
+    fake.create_repo(REPO, {reporter_client.DASHBOARD_PATH: DASHBOARD})
+    return fake
+
+
+def _log_lines(text):
+    block = text.split(reporter_client.LOG_START, 1)[1].split(reporter_client.LOG_END, 1)[0]
+    return [line for line in block.split("\n") if line.startswith("- `")]
+
+
+def test_conflict_retry_reapplies_log_on_top_of_other_writer(repo):
+    reporter = reporter_client.ProjectReporter(TOKEN, REPO)
+    reporter.register("A")
+    # 其他 agent 在 reporter 讀取後改了 STATUS.md：快取的 SHA 已過期，寫入會收到 409
+    path = "projects/A/STATUS.md"
+    other = repo.read(REPO, path).replace(reporter_client.LOG_START, reporter_client.LOG_START + "\n- `2026-01-01 00:00:00` ℹ️ **INFO**: from other agent", 1)
+    repo.write_files(REPO, {path: other})
+
+    reporter.log("A", "from reporter")
+
+    lines = _log_lines(repo.read(REPO, path))
+    assert "from reporter" in lines[0]
+    assert any("from other agent" in line for line in lines)
+
+
+def test_conflict_retry_in_batch_keeps_other_dashboard_edits(repo):
+    reporter = reporter_client.ProjectReporter(TOKEN, REPO)
+    reporter.register("A")
+    reporter.register("B")
+    projects = reporter_client._parse_dashboard_index(repo.read(REPO, reporter_client.DASHBOARD_PATH))
+    projects["B"]["status"] = "changed elsewhere"
+    repo.write_files(REPO, {reporter_client.DASHBOARD_PATH: reporter_client._render_dashboard(repo.read(REPO, reporter_client.DASHBOARD_PATH), projects)})
+
+    with reporter.batch() as result:
+        reporter.log("A", "one")
+        reporter.update_status("A", "done")
+
+    assert result["status"] == "published"
+    projects = reporter_client._parse_dashboard_index(repo.read(REPO, reporter_client.DASHBOARD_PATH))
+    assert projects["A"]["status"] == "done"
+    assert projects["B"]["status"] == "changed elsewhere"
+
+
+def test_replay_is_idempotent(repo, tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    reporter_client.ProjectReporter(TOKEN, REPO).register("A")
+    offline = reporter_client.ProjectReporter(TOKEN, REPO, offline=True, spool_path=spool)
+    offline.log("A", "worked offline")
+    with open(spool, "r", encoding="utf-8") as f:
+        spooled = f.read()
+    assert "worked offline" in spooled
+
+    online = reporter_client.ProjectReporter(TOKEN, REPO, spool_path=spool)
+    assert online.replay() == 1
+    # 同一批回報再重送一次 (例如 replay 中途失敗後重跑)：不會產生重複的日誌
+    with open(spool, "w", encoding="utf-8") as f:
+        f.write(spooled)
+    online.replay()
+
+    lines = _log_lines(repo.read(REPO, "projects/A/STATUS.md"))
+    assert sum("worked offline" in line for line in lines) == 1
+    assert online.replay() == 0
+
+
+def test_rotate_log_archives_overflow_with_hysteresis(repo):
+    reporter = reporter_client.ProjectReporter(TOKEN, REPO, max_log_entries=2)
+    reporter.register("A")
+    while len(_log_lines(repo.read(REPO, "projects/A/STATUS.md"))) < 2 * reporter_client.LOG_ROTATE_FACTOR:
+        reporter.log("A", "entry")
+    # 還沒超過 max_log_entries * LOG_ROTATE_FACTOR 筆：不封存
+    assert not any(path.startswith("projects/A/log/") for path in repo.head_tree(REPO))
+
+    reporter.log("A", "overflow")
+
+    status = _log_lines(repo.read(REPO, "projects/A/STATUS.md"))
+    assert len(status) == 2 and "overflow" in status[0]
+    shards = [path for path in repo.head_tree(REPO) if re.match(r"projects/A/log/\d{4}-\d{2}\.md$", path)]
+    assert len(shards) == 1
+    archived = _log_lines(repo.read(REPO, shards[0]))
+    assert len(archived) == 3
+    month = shards[0][-10:-3]
+    assert f"| [{month}]({month}.md) | 3 |" in repo.read(REPO, "projects/A/log/INDEX.md")
+
+
+def test_rotate_log_compares_whole_lines(repo):
+    status = (
+        "# Project Status: A\n\n"
+        f"{reporter_client.LOG_START}\n"
+        "- `2026-01-05 10:00:00` ℹ️ **INFO**: newest\n"
+        "- `2026-01-04 10:00:00` ℹ️ **INFO**: Deploy done\n"
+        "- `2026-01-03 10:00:00` ℹ️ **INFO**: keep\n"
+        "- `2026-01-02 10:00:00` ℹ️ **INFO**: Deploy\n"
+        "- `2026-01-01 10:00:00` ℹ️ **INFO**: Deploy\n"
+        f"{reporter_client.LOG_END}\n"
+    )
+    shard = (
+        "# Activity Log Archive: A (2026-01)\n\n"
+        f"{reporter_client.LOG_START}\n"
+        "- `2026-01-02 10:00:00` ℹ️ **INFO**: Deploy done\n"
+        f"{reporter_client.LOG_END}\n"
+    )
+    repo.write_files(REPO, {"projects/A/STATUS.md": status, "projects/A/log/2026-01.md": shard})
+    reporter = reporter_client.ProjectReporter(TOKEN, REPO, max_log_entries=2)
+    changes = reporter_client._Changeset(reporter._read_contents)
+
+    kept = reporter._rotate_log("A", status, changes)
+
+    assert [line.split("**: ")[1] for line in _log_lines(kept)] == ["newest", "Deploy done"]
+    archived = [line.split("**: ")[1] for line in _log_lines(changes.read("projects/A/log/2026-01.md"))]
+    # "Deploy" 是已封存的 "Deploy done" 的前綴，仍然要封存
+    assert sorted(archived) == ["Deploy", "Deploy", "Deploy done", "keep"]
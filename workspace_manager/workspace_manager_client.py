@@ -1,6 +1,33 @@
 import os
 import re
+import time
+import argparse
+import sys
 import subprocess
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+# 共用模組 (common/)；量測 (common/metrics.py) 只在設定 SKILL_METRICS 時啟用
+_COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common")
+if _COMMON_DIR not in sys.path:
+    sys.path.insert(0, _COMMON_DIR)
+# DASHBOARD.md 內嵌的專案索引 (與 command_center_reporter 共用同一個解析器)
+from dashboard_index import parse_index
+
+try:
+    from metrics import operation, timed, count as count_metric, wrap as metrics_wrap
+except ImportError:
+    def operation(name, **labels):
+        return nullcontext()
+
+    def timed(name):
+        return lambda fn: fn
+
+    def count_metric(key, n=1):
+        pass
+
+    def metrics_wrap(fn):
+        return fn
 
 class WorkspaceManager:
     def __init__(self, workspace_root):
@@ -9,13 +36,22 @@ class WorkspaceManager:
         self.dashboard_path = os.path.join(self.root, "DASHBOARD.md")
 
     def get_active_projects(self):
-        """解析 DASHBOARD.md 表格，提取專案名稱與 Git 連結"""
+        """讀取 DASHBOARD.md 內嵌的專案索引 (沒有時解析表格)，提取專案名稱與 Git 連結"""
         projects = []
         if not os.path.exists(self.dashboard_path):
             return projects
 
         with open(self.dashboard_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+            content = f.read()
+        index = parse_index(content)
+        if index is not None:
+            for name, row in index.items():
+                match = re.search(r"\[Repo\]\((.*?)\)", row.get("link") or "")
+                if match:
+                    projects.append({"name": name, "url": match.group(1).strip()})
+            return projects
+
+        lines = content.splitlines()
 
         # 尋找表格行：| Type | Project Name | Link | Status |
         # 範例：| 🎨 | **Beauty-PK** | [Repo](https://github.com/alstonhuang/beauty-pk) | ✅ Active |
@@ -27,30 +63,161 @@ class WorkspaceManager:
                 projects.append({"name": name, "url": repo_url})
         return projects
 
-    def sync_all_projects(self):
-        """批量克隆所有專案"""
+    @timed("workspace.sync")
+    def sync_all_projects(self, max_workers=4, depth=None, filter_spec=None, sparse_paths=None):
+        """
+        批量克隆所有專案 (平行執行)
+        max_workers: 同時進行的 clone 數量
+        depth: 淺層 clone 的歷史深度 (git clone --depth)，None 表示完整歷史
+        filter_spec: partial clone 過濾條件，例如 "blob:none" (git clone --filter)
+        sparse_paths: 只 checkout 這些路徑 (git sparse-checkout)，None 表示全部
+        回傳結果字串列表 (與專案順序相同，含每個專案的耗時)
+        """
         projects = self.get_active_projects()
-        results = []
-        
+
         if not os.path.exists(self.projects_dir):
             os.makedirs(self.projects_dir)
 
-        for p in projects:
+        def clone(p):
             target_path = os.path.join(self.projects_dir, p['name'])
             if os.path.exists(target_path):
-                results.append(f"⏩ {p['name']} 已存在，跳過。")
-                continue
-            
-            print(f"กำลังดึง數據 {p['name']}...") # 這裡是測試訊息
-            try:
-                subprocess.run(["git", "clone", p['url'], target_path], check=True)
-                results.append(f"✅ {p['name']} 複製成功。")
-            except Exception as e:
-                results.append(f"❌ {p['name']} 複製失敗: {str(e)}")
-        
-        return results
+                return f"⏩ {p['name']} 已存在，跳過。"
+
+            print(f"📥 正在複製 {p['name']}...")
+            cmd = ["git", "clone"]
+            if depth:
+                cmd += ["--depth", str(depth)]
+            if filter_spec:
+                cmd += [f"--filter={filter_spec}"]
+            if sparse_paths:
+                cmd += ["--sparse"]
+            cmd += [p['url'], target_path]
+
+            started = time.monotonic()
+            with operation("workspace.clone", project=p['name']):
+                try:
+                    count_metric("git_commands")
+                    subprocess.run(cmd, check=True, capture_output=True, text=True)
+                    if sparse_paths:
+                        count_metric("git_commands")
+                        subprocess.run(["git", "-C", target_path, "sparse-checkout", "set", *sparse_paths],
+                                       check=True, capture_output=True, text=True)
+                    return f"✅ {p['name']} 複製成功。({time.monotonic() - started:.1f}s)"
+                except subprocess.CalledProcessError as e:
+                    count_metric("errors")
+                    return f"❌ {p['name']} 複製失敗: {(e.stderr or str(e)).strip()} ({time.monotonic() - started:.1f}s)"
+                except Exception as e:
+                    count_metric("errors")
+                    return f"❌ {p['name']} 複製失敗: {str(e)}"
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return list(pool.map(metrics_wrap(clone), projects))
+
+    @timed("workspace.update")
+    def update_all_projects(self, max_workers=8):
+        """
+        增量更新已克隆的專案 (平行執行)：
+        1. 以 git ls-remote 比對遠端分支與本地追蹤分支，沒變就不 fetch
+        2. 有變動才 git fetch 該分支
+        3. 工作目錄乾淨時才 fast-forward (git merge --ff-only)
+        回傳每個專案的結果 dict：
+            {"name", "status", "message", "old", "new", "elapsed"}
+        status: unchanged / updated / fetched / ahead / dirty / diverged / missing / skipped / error
+        """
+        projects = self.get_active_projects()
+
+        def update(p):
+            target_path = os.path.join(self.projects_dir, p['name'])
+            result = {"name": p['name'], "status": "", "message": "", "old": None, "new": None, "elapsed": 0.0}
+            started = time.monotonic()
+            with operation("workspace.update_repo", project=p['name']) as op:
+                try:
+                    result.update(self._update_repo(target_path))
+                except subprocess.CalledProcessError as e:
+                    result.update(status="error", message=(e.stderr or str(e)).strip())
+                except Exception as e:
+                    result.update(status="error", message=str(e))
+                if op is not None:
+                    op.labels["result"] = result["status"]
+            result["elapsed"] = round(time.monotonic() - started, 3)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return list(pool.map(metrics_wrap(update), projects))
+
+    def _update_repo(self, path):
+        """更新單一 repo，回傳要併入結果的欄位"""
+        if not os.path.isdir(os.path.join(path, ".git")):
+            return {"status": "missing", "message": "尚未克隆，請先執行 sync"}
+
+        try:
+            upstream = _git(path, "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}")
+        except subprocess.CalledProcessError:
+            return {"status": "skipped", "message": "目前分支沒有 upstream (detached HEAD?)"}
+        remote, branch = upstream.split("/", 1)
+
+        head = _git(path, "rev-parse", "HEAD")
+        tracking = _git(path, "rev-parse", upstream)
+        ls_remote = _git(path, "ls-remote", remote, f"refs/heads/{branch}")
+        remote_sha = ls_remote.split()[0] if ls_remote else None
+        if remote_sha is None:
+            return {"status": "error", "message": f"遠端沒有分支 {branch}", "old": head}
+
+        fetched = False
+        if remote_sha != tracking:
+            _git(path, "fetch", remote, branch)
+            fetched = True
+
+        if head == remote_sha:
+            return {"status": "fetched" if fetched else "unchanged", "old": head, "new": head}
+
+        # 本地已包含遠端的 commit (有尚未 push 的 commit)：merge --ff-only 會是 no-op，不算更新
+        try:
+            _git(path, "merge-base", "--is-ancestor", remote_sha, "HEAD")
+        except subprocess.CalledProcessError:
+            pass
+        else:
+            return {"status": "ahead", "message": "本地有尚未 push 的 commit", "old": head, "new": head}
+
+        if _git(path, "status", "--porcelain", "--untracked-files=no"):
+            return {"status": "dirty", "message": "工作目錄有未提交的變更，未合併", "old": head}
+
+        try:
+            _git(path, "merge", "--ff-only", upstream)
+        except subprocess.CalledProcessError:
+            return {"status": "diverged", "message": "無法 fast-forward (本地有額外的 commit)", "old": head}
+        return {"status": "updated", "old": head, "new": _git(path, "rev-parse", "HEAD")}
+
+
+def _git(path, *args):
+    """在 path 中執行 git 指令並回傳 stdout (失敗時丟出 CalledProcessError)"""
+    count_metric("git_commands")
+    return subprocess.run(["git", "-C", path, *args], check=True, capture_output=True, text=True).stdout.strip()
 
 if __name__ == "__main__":
-    # 簡單測試
+    parser = argparse.ArgumentParser(description="Workspace Manager")
+    sub = parser.add_subparsers(dest="command")
+    sync_parser = sub.add_parser("sync", help="克隆 DASHBOARD 中所有專案到 projects/")
+    sync_parser.add_argument("--jobs", type=int, default=4, help="同時進行的 clone 數量 (預設 4)")
+    sync_parser.add_argument("--depth", type=int, help="淺層 clone 深度，例如 1")
+    sync_parser.add_argument("--filter", dest="filter_spec", help="partial clone 過濾條件，例如 blob:none")
+    sync_parser.add_argument("--sparse", nargs="+", metavar="PATH", help="只 checkout 指定路徑")
+    update_parser = sub.add_parser("update", help="增量更新 projects/ 中已克隆的專案")
+    update_parser.add_argument("--jobs", type=int, default=8, help="同時更新的專案數量 (預設 8)")
+    args = parser.parse_args()
+
     mgr = WorkspaceManager(".")
-    print("偵測到的專案:", mgr.get_active_projects())
+    if args.command == "sync":
+        started = time.monotonic()
+        for line in mgr.sync_all_projects(args.jobs, args.depth, args.filter_spec, args.sparse):
+            print(line)
+        print(f"⏱️ 總耗時 {time.monotonic() - started:.1f}s")
+    elif args.command == "update":
+        started = time.monotonic()
+        icons = {"unchanged": "⏹️", "updated": "✅", "fetched": "📥", "ahead": "⬆️", "dirty": "⚠️", "diverged": "⚠️"}
+        for r in mgr.update_all_projects(args.jobs):
+            print(f"{icons.get(r['status'], '❌')} {r['name']}: {r['status']} {r['message']} ({r['elapsed']:.1f}s)")
+        print(f"⏱️ 總耗時 {time.monotonic() - started:.1f}s")
+    else:
+        # 簡單測試
+        print("偵測到的專案:", mgr.get_active_projects())